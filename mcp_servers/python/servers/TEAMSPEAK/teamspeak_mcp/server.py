@@ -6,8 +6,15 @@ import argparse
 import asyncio
 import logging
 import os
+import queue
 import sys
-from typing import Any, Dict, List, Optional, Sequence
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
 
 import ts3
 from mcp.server import Server
@@ -54,9 +61,23 @@ class TeamSpeakConnection:
         self.user = user or os.getenv("TEAMSPEAK_USER", "serveradmin")
         self.password = password or os.getenv("TEAMSPEAK_PASSWORD", "")
         self.server_id = server_id or int(os.getenv("TEAMSPEAK_SERVER_ID", "1"))
+        # Number of tool calls currently borrowing this connection from the pool
+        self.in_use = 0
+        self._connect_lock = asyncio.Lock()
+        # py-ts3 connections are not thread-safe, so a pooled connection serves
+        # one tool call at a time
+        self._borrow_lock = asyncio.Lock()
         
     async def connect(self) -> bool:
         """Connect to TeamSpeak server."""
+        # Concurrent calls sharing a pooled connection must open only one socket
+        async with self._connect_lock:
+            if self.connection is not None:
+                return True
+            return await self._open()
+
+    async def _open(self) -> bool:
+        """Open and authenticate the ServerQuery connection."""
         try:
             # Use asyncio.to_thread for blocking operations
             self.connection = await asyncio.to_thread(ts3.query.TS3Connection, self.host, self.port)
@@ -112,17 +133,114 @@ class TeamSpeakConnection:
         return self.connection is not None
 
 
+# Connections opened from dynamic credentials are pooled per credential set so
+# consecutive tool calls reuse the authenticated ServerQuery session. Idle
+# entries are dropped well before the server-side query idle timeout.
+CONNECTION_POOL_SIZE = 8
+CONNECTION_IDLE_TTL = 120.0
+_connection_pool: "OrderedDict[tuple, tuple[float, TeamSpeakConnection]]" = OrderedDict()
+_closing_connections: set = set()
+
+# Errors meaning the ServerQuery socket itself is unusable, as opposed to a
+# query the server rejected
+_TRANSPORT_ERRORS = (ts3.query.TS3RecvError, OSError, EOFError)
+
+
+def _discard_connection(connection: TeamSpeakConnection) -> None:
+    """Disconnect a connection evicted from the pool in the background."""
+    # Connections still borrowed by a tool call are closed when it returns them
+    if connection.in_use == 0 and connection.is_connected():
+        task = asyncio.ensure_future(connection.disconnect())
+        _closing_connections.add(task)
+        task.add_done_callback(_closing_connections.discard)
+
+
+def _is_pooled(key: tuple, connection: TeamSpeakConnection) -> bool:
+    """Check whether the pool still holds this connection under key."""
+    entry = _connection_pool.get(key)
+    return entry is not None and entry[1] is connection
+
+
+def _is_transport_error(error: BaseException) -> bool:
+    """Check an exception and the errors it was raised from for a dropped socket."""
+    while error is not None:
+        if isinstance(error, _TRANSPORT_ERRORS):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def _pool_key(creds: dict) -> tuple:
+    """Build the pool key for a set of dynamic credentials."""
+    return (
+        creds.get("host", "localhost"),
+        int(creds.get("port", "10011")),
+        creds.get("user", "serveradmin"),
+        creds.get("password", ""),
+        int(creds.get("server_id", "1")),
+    )
+
+
+def _get_pooled_connection(host, port, user, password, server_id) -> TeamSpeakConnection:
+    """Return the pooled connection for these credentials, creating it if needed."""
+    now = time.monotonic()
+    for key, (last_used, connection) in list(_connection_pool.items()):
+        if connection.in_use == 0 and now - last_used >= CONNECTION_IDLE_TTL:
+            del _connection_pool[key]
+            _discard_connection(connection)
+
+    key = (host, port, user, password, server_id)
+    entry = _connection_pool.pop(key, None)
+    if entry is not None:
+        connection = entry[1]
+    else:
+        connection = TeamSpeakConnection(
+            host=host, port=port, user=user, password=password, server_id=server_id
+        )
+    _connection_pool[key] = (now, connection)
+
+    while len(_connection_pool) > CONNECTION_POOL_SIZE:
+        _, (_, evicted) = _connection_pool.popitem(last=False)
+        _discard_connection(evicted)
+
+    return connection
+
+
+@asynccontextmanager
+async def _borrowed_connection(args: Optional[dict]):
+    """Hold the pooled connection for a tool call, dropping it if its socket fails."""
+    if not (args and "teamspeak_credentials" in args):
+        yield
+        return
+
+    key = _pool_key(args["teamspeak_credentials"])
+    connection = _get_pooled_connection(*key)
+    connection.in_use += 1
+    try:
+        async with connection._borrow_lock:
+            yield
+    except Exception as e:
+        if _is_transport_error(e) and _is_pooled(key, connection):
+            logger.warning(f"Dropping pooled TeamSpeak connection after transport error: {e}")
+            del _connection_pool[key]
+        raise
+    finally:
+        connection.in_use -= 1
+        if not _is_pooled(key, connection):
+            _discard_connection(connection)
+
+
+async def close_connection_pool() -> None:
+    """Disconnect every pooled connection."""
+    while _connection_pool:
+        _, (_, connection) = _connection_pool.popitem()
+        await connection.disconnect()
+
+
 def get_connection_from_args(args: dict = None) -> 'TeamSpeakConnection':
     """Get TeamSpeak connection from dynamic credentials or use global connection."""
     if args and "teamspeak_credentials" in args:
-        creds = args["teamspeak_credentials"]
-        return TeamSpeakConnection(
-            host=creds.get("host", "localhost"),
-            port=int(creds.get("port", "10011")),
-            user=creds.get("user", "serveradmin"),
-            password=creds.get("password", ""),
-            server_id=int(creds.get("server_id", "1"))
-        )
+        return _get_pooled_connection(*_pool_key(args["teamspeak_credentials"]))
     else:
         return ts_connection
 
@@ -963,6 +1081,11 @@ TOOLS = [
         inputSchema={
             "type": "object",
             "properties": {
+                "verbose": {
+                    "type": "boolean",
+                    "description": "List every serverinfo field instead of the main ones",
+                    "default": False,
+                },
             },
             "additionalProperties": True,
         },
@@ -974,6 +1097,15 @@ TOOLS = [
         inputSchema={
             "type": "object",
             "properties": {
+                "save_to_path": {
+                    "type": "string",
+                    "description": "Optional file name, relative to TEAMSPEAK_SNAPSHOT_DIR, to write the full snapshot to",
+                },
+                "overwrite": {
+                    "type": "boolean",
+                    "description": "Replace an existing snapshot file at save_to_path (default: false)",
+                    "default": False,
+                },
             },
             "additionalProperties": True,
         },
@@ -1015,6 +1147,13 @@ TOOLS = [
                     "type": "integer",
                     "description": "Starting position in log file (optional)",
                 },
+                "pages": {
+                    "type": "integer",
+                    "description": "Number of consecutive pages of `lines` entries to fetch in one call (1-10, default: 1)",
+                    "default": 1,
+                    "minimum": 1,
+                    "maximum": 10,
+                },
             },
             "required": [],
             "additionalProperties": True,
@@ -1039,6 +1178,11 @@ async def run_server():
     # Parse command line arguments
     args = parse_args()
     
+    # Every ServerQuery call goes through asyncio.to_thread; share one bounded pool
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=16, thread_name_prefix="teamspeak-query")
+    )
+    
     # Initialize connection with default values (will be overridden by dynamic credentials)
     ts_connection = TeamSpeakConnection()
     
@@ -1054,88 +1198,89 @@ async def run_server():
     async def handle_call_tool(name: str, arguments: dict) -> list[TextContent]:
         """Execute a requested tool."""
         try:
-            if name == "connect_to_server":
-                return await _connect_to_server(arguments)
-            elif name == "send_channel_message":
-                return await _send_channel_message(arguments)
-            elif name == "send_private_message":
-                return await _send_private_message(arguments)
-            elif name == "poke_client":
-                return await _poke_client(arguments)
-            elif name == "list_clients":
-                return await _list_clients(arguments)
-            elif name == "list_channels":
-                return await _list_channels(arguments)
-            elif name == "create_channel":
-                return await _create_channel(arguments)
-            elif name == "delete_channel":
-                return await _delete_channel(arguments)
-            elif name == "move_client":
-                return await _move_client(arguments)
-            elif name == "kick_client":
-                return await _kick_client(arguments)
-            elif name == "ban_client":
-                return await _ban_client(arguments)
-            elif name == "server_info":
-                return await _server_info(arguments)
-            elif name == "update_channel":
-                return await _update_channel(arguments)
-            elif name == "set_channel_talk_power":
-                return await _set_channel_talk_power(arguments)
-            elif name == "channel_info":
-                return await _channel_info(arguments)
-            elif name == "manage_channel_permissions":
-                return await _manage_channel_permissions(arguments)
-            elif name == "client_info_detailed":
-                return await _client_info_detailed(arguments)
-            elif name == "update_server_settings":
-                return await _update_server_settings(arguments)
-            elif name == "manage_user_permissions":
-                return await _manage_user_permissions(arguments)
-            elif name == "diagnose_permissions":
-                return await _diagnose_permissions(arguments)
-            elif name == "list_server_groups":
-                return await _list_server_groups(arguments)
-            elif name == "assign_client_to_group":
-                return await _assign_client_to_group(arguments)
-            elif name == "create_server_group":
-                return await _create_server_group(arguments)
-            elif name == "manage_server_group_permissions":
-                return await _manage_server_group_permissions(arguments)
-            elif name == "list_bans":
-                return await _list_bans(arguments)
-            elif name == "manage_ban_rules":
-                return await _manage_ban_rules(arguments)
-            elif name == "list_complaints":
-                return await _list_complaints(arguments)
-            elif name == "search_clients":
-                return await _search_clients(arguments)
-            elif name == "find_channels":
-                return await _find_channels(arguments)
-            elif name == "list_privilege_tokens":
-                return await _list_privilege_tokens(arguments)
-            elif name == "create_privilege_token":
-                return await _create_privilege_token(arguments)
-            elif name == "list_files":
-                return await _list_files(arguments)
-            elif name == "get_file_info":
-                return await _get_file_info(arguments)
-            elif name == "manage_file_permissions":
-                return await _manage_file_permissions(arguments)
-            elif name == "view_server_logs":
-                return await _view_server_logs(arguments)
-            elif name == "add_log_entry":
-                return await _add_log_entry(arguments)
-            elif name == "get_connection_info":
-                return await _get_connection_info(arguments)
-            elif name == "create_server_snapshot":
-                return await _create_server_snapshot(arguments)
-            elif name == "deploy_server_snapshot":
-                return await _deploy_server_snapshot(arguments)
-            elif name == "get_instance_logs":
-                return await _get_instance_logs(arguments)
-            else:
-                raise ValueError(f"Unknown tool: {name}")
+            async with _borrowed_connection(arguments):
+                if name == "connect_to_server":
+                    return await _connect_to_server(arguments)
+                elif name == "send_channel_message":
+                    return await _send_channel_message(arguments)
+                elif name == "send_private_message":
+                    return await _send_private_message(arguments)
+                elif name == "poke_client":
+                    return await _poke_client(arguments)
+                elif name == "list_clients":
+                    return await _list_clients(arguments)
+                elif name == "list_channels":
+                    return await _list_channels(arguments)
+                elif name == "create_channel":
+                    return await _create_channel(arguments)
+                elif name == "delete_channel":
+                    return await _delete_channel(arguments)
+                elif name == "move_client":
+                    return await _move_client(arguments)
+                elif name == "kick_client":
+                    return await _kick_client(arguments)
+                elif name == "ban_client":
+                    return await _ban_client(arguments)
+                elif name == "server_info":
+                    return await _server_info(arguments)
+                elif name == "update_channel":
+                    return await _update_channel(arguments)
+                elif name == "set_channel_talk_power":
+                    return await _set_channel_talk_power(arguments)
+                elif name == "channel_info":
+                    return await _channel_info(arguments)
+                elif name == "manage_channel_permissions":
+                    return await _manage_channel_permissions(arguments)
+                elif name == "client_info_detailed":
+                    return await _client_info_detailed(arguments)
+                elif name == "update_server_settings":
+                    return await _update_server_settings(arguments)
+                elif name == "manage_user_permissions":
+                    return await _manage_user_permissions(arguments)
+                elif name == "diagnose_permissions":
+                    return await _diagnose_permissions(arguments)
+                elif name == "list_server_groups":
+                    return await _list_server_groups(arguments)
+                elif name == "assign_client_to_group":
+                    return await _assign_client_to_group(arguments)
+                elif name == "create_server_group":
+                    return await _create_server_group(arguments)
+                elif name == "manage_server_group_permissions":
+                    return await _manage_server_group_permissions(arguments)
+                elif name == "list_bans":
+                    return await _list_bans(arguments)
+                elif name == "manage_ban_rules":
+                    return await _manage_ban_rules(arguments)
+                elif name == "list_complaints":
+                    return await _list_complaints(arguments)
+                elif name == "search_clients":
+                    return await _search_clients(arguments)
+                elif name == "find_channels":
+                    return await _find_channels(arguments)
+                elif name == "list_privilege_tokens":
+                    return await _list_privilege_tokens(arguments)
+                elif name == "create_privilege_token":
+                    return await _create_privilege_token(arguments)
+                elif name == "list_files":
+                    return await _list_files(arguments)
+                elif name == "get_file_info":
+                    return await _get_file_info(arguments)
+                elif name == "manage_file_permissions":
+                    return await _manage_file_permissions(arguments)
+                elif name == "view_server_logs":
+                    return await _view_server_logs(arguments)
+                elif name == "add_log_entry":
+                    return await _add_log_entry(arguments)
+                elif name == "get_connection_info":
+                    return await _get_connection_info(arguments)
+                elif name == "create_server_snapshot":
+                    return await _create_server_snapshot(arguments)
+                elif name == "deploy_server_snapshot":
+                    return await _deploy_server_snapshot(arguments)
+                elif name == "get_instance_logs":
+                    return await _get_instance_logs(arguments)
+                else:
+                    raise ValueError(f"Unknown tool: {name}")
         except Exception as e:
             raise Exception(f"Error: {str(e)}")
     
@@ -1159,6 +1304,7 @@ async def run_server():
                 ),
             )
     finally:
+        await close_connection_pool()
         if ts_connection:
             await ts_connection.disconnect()
 
@@ -2850,9 +2996,11 @@ async def _view_server_logs(args: dict) -> list[TextContent]:
             
             if log_entries:
                 result += f"**{len(log_entries)} entrées trouvées:**\n\n"
-                for i, entry in enumerate(log_entries[-lines:], 1):  # Take last N lines
-                    if entry:
-                        result += f"**{i}.** {entry}\n"
+                result += "".join(
+                    f"**{i}.** {entry}\n"
+                    for i, entry in enumerate(log_entries[-lines:], 1)  # Take last N lines
+                    if entry
+                )
             else:
                 result += "❌ **Aucune entrée de log trouvée.**\n\n"
                 result += "**Données brutes reçues:**\n"
@@ -3012,8 +3160,7 @@ async def _view_server_logs_enhanced_impl(lines: int, reverse: bool, instance_lo
 
 """
         
-        for i, log_line in enumerate(logs, 1):
-            result += f"**{i}.** {log_line}\n"
+        result += "".join(f"**{i}.** {log_line}\n" for i, log_line in enumerate(logs, 1))
         
         result += f"""
 **Debug info:**
@@ -3061,6 +3208,23 @@ async def _add_log_entry(args: dict) -> list[TextContent]:
     except Exception as e:
         raise Exception(f"Error adding log entry: {e}")
 
+# Main serverinfo fields; missing ones render as "?"
+_SERVERINFO_TEMPLATE = (
+    "🖥️ **Server Connection Information:**\n\n"
+    "• **virtualserver_name**: {virtualserver_name}\n"
+    "• **virtualserver_unique_identifier**: {virtualserver_unique_identifier}\n"
+    "• **virtualserver_platform**: {virtualserver_platform}\n"
+    "• **virtualserver_version**: {virtualserver_version}\n"
+    "• **virtualserver_status**: {virtualserver_status}\n"
+    "• **virtualserver_port**: {virtualserver_port}\n"
+    "• **virtualserver_clientsonline**: {virtualserver_clientsonline}\n"
+    "• **virtualserver_maxclients**: {virtualserver_maxclients}\n"
+    "• **virtualserver_channelsonline**: {virtualserver_channelsonline}\n"
+    "• **virtualserver_uptime**: {virtualserver_uptime}\n"
+    "• **virtualserver_total_ping**: {virtualserver_total_ping}\n"
+    "• **virtualserver_total_packetloss_total**: {virtualserver_total_packetloss_total}\n"
+)
+
 async def _get_connection_info(args: dict = None) -> list[TextContent]:
     """Get detailed connection information for the virtual server."""
     # Create connection with dynamic credentials if provided
@@ -3084,14 +3248,33 @@ async def _get_connection_info(args: dict = None) -> list[TextContent]:
         else:
             raise Exception("Unexpected response format")
         
-        result = "🖥️ **Server Connection Information:**\n\n"
-        for key, value in info.items():
-            result += f"• **{key}**: {value}\n"
+        if (args or {}).get("verbose", False):
+            result = "🖥️ **Server Connection Information:**\n\n" + "".join(
+                f"• **{key}**: {value}\n" for key, value in info.items()
+            )
+        else:
+            result = _SERVERINFO_TEMPLATE.format_map(defaultdict(lambda: "?", info))
         
         return [TextContent(type="text", text=result)]
     except Exception as e:
         raise Exception(f"Error retrieving connection info: {e}")
 
+def _resolve_snapshot_path(save_to_path: str) -> Path:
+    """Resolve a snapshot file path, rejecting anything outside the snapshot directory."""
+    snapshot_dir = Path(os.getenv("TEAMSPEAK_SNAPSHOT_DIR", "snapshots")).resolve()
+    target = (snapshot_dir / save_to_path).resolve()
+    if target == snapshot_dir or not target.is_relative_to(snapshot_dir):
+        raise ValueError(f"save_to_path must be a file inside {snapshot_dir}")
+    return target
+
+
+def _write_snapshot(target: Path, snapshot: str, overwrite: bool) -> None:
+    """Write a snapshot file, only replacing an existing one when asked to."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with open(target, "w" if overwrite else "x", encoding="utf-8") as snapshot_file:
+        snapshot_file.write(snapshot)
+
+
 async def _create_server_snapshot(args: dict = None) -> list[TextContent]:
     """Create a snapshot of the virtual server configuration."""
     # Create connection with dynamic credentials if provided
@@ -3115,21 +3298,36 @@ async def _create_server_snapshot(args: dict = None) -> list[TextContent]:
         result = "📸 **Server Snapshot Created Successfully**\n\n"
         result += "⚠️ **Important**: Save this snapshot data for restoration:\n\n"
         
-        # The snapshot data is typically very long, so we'll show a preview
+        # The snapshot data is typically very long (megabytes), so only the
+        # previewed slice is ever converted to a string
         if isinstance(snapshot_data, dict):
             for key, value in snapshot_data.items():
-                if len(str(value)) > 100:
-                    preview = str(value)[:100] + "..."
-                    result += f"• **{key}**: {preview}\n"
+                if hasattr(value, '__len__') and len(value) > 100:
+                    result += f"• **{key}**: {str(value[:100])}...\n"
                 else:
                     result += f"• **{key}**: {value}\n"
+        elif hasattr(snapshot_data, '__len__') and len(snapshot_data) > 500:
+            result += f"```\n{str(snapshot_data[:500])}...\n```\n"
         else:
-            # If it's a string, show preview
-            snapshot_str = str(snapshot_data)
-            if len(snapshot_str) > 500:
-                result += f"```\n{snapshot_str[:500]}...\n```\n"
+            result += f"```\n{snapshot_data}\n```\n"
+        
+        save_to_path = (args or {}).get("save_to_path")
+        if save_to_path:
+            target = _resolve_snapshot_path(save_to_path)
+            # Save the snapshot line exactly as the server sent it, which is
+            # what deploy_server_snapshot expects back
+            raw_lines = getattr(response, "data", None)
+            if raw_lines:
+                snapshot_str = raw_lines[0].decode("utf-8")
             else:
-                result += f"```\n{snapshot_str}\n```\n"
+                snapshot_str = str(snapshot_data)
+            try:
+                await asyncio.to_thread(
+                    _write_snapshot, target, snapshot_str, args.get("overwrite") is True
+                )
+            except FileExistsError:
+                raise Exception(f"{target} already exists; pass overwrite=true to replace it")
+            result += f"\n💾 **Full snapshot saved to**: `{target}`\n"
         
         result += "\n💡 **Tip**: Use `deploy_server_snapshot` to restore this configuration."
         
@@ -3162,6 +3360,16 @@ async def _deploy_server_snapshot(args: dict) -> list[TextContent]:
     except Exception as e:
         raise Exception(f"Error deploying server snapshot: {e}")
 
+def _format_log_lines(log_lines: List[str]) -> Iterator[str]:
+    """Yield numbered, readable entries for raw ``timestamp|level|...|message`` log lines."""
+    for i, line in enumerate(log_lines, 1):
+        parts = line.split('|', 2)
+        if len(parts) == 3:
+            timestamp, level, message = parts
+            yield f"**{i}.** `{timestamp.strip()}` [{level.strip()}] {message.strip()}"
+        else:
+            yield f"**{i}.** {line}"
+
 async def _get_instance_logs(args: dict) -> list[TextContent]:
     """Get instance-level logs instead of virtual server logs."""
     # Create connection with dynamic credentials if provided
@@ -3176,6 +3384,10 @@ async def _get_instance_logs(args: dict) -> list[TextContent]:
     lines = args.get("lines", 50)
     reverse = args.get("reverse", True)
     begin_pos = args.get("begin_pos")
+    try:
+        pages = max(1, min(int(args.get("pages") or 1), 10))
+    except (TypeError, ValueError):
+        pages = 1
     
     try:
         kwargs = {
@@ -3184,35 +3396,41 @@ async def _get_instance_logs(args: dict) -> list[TextContent]:
             "instance": 1  # This requests instance logs instead of virtual server logs
         }
         
-        if begin_pos is not None:
-            kwargs["begin_pos"] = begin_pos
-        
-        response = await asyncio.to_thread(connection.connection.logview, **kwargs)
+        # ServerQuery answers one command at a time on a connection, so pages are
+        # fetched back to back, each continuing from the previous page's last_pos
+        log_pages = []
+        for _ in range(pages):
+            if begin_pos is not None:
+                kwargs["begin_pos"] = begin_pos
+            
+            response = await asyncio.to_thread(connection.connection.logview, **kwargs)
+            if not (hasattr(response, 'parsed') and response.parsed):
+                break
+            
+            log_pages.append(response.parsed)
+            begin_pos = response.parsed[0].get('last_pos')
+            if not begin_pos or begin_pos == '0':
+                break
         
-        result = f"📋 **TeamSpeak Instance Logs (last {lines} entries)**\n\n"
+        if pages > 1:
+            result = f"📋 **TeamSpeak Instance Logs ({len(log_pages)} pages of {lines} entries)**\n\n"
+        else:
+            result = f"📋 **TeamSpeak Instance Logs (last {lines} entries)**\n\n"
         
-        if hasattr(response, 'parsed') and response.parsed:
-            log_data = response.parsed[0]
-            if 'l' in log_data:
+        if log_pages:
+            entries = [entry['l'] for page in log_pages for entry in page if 'l' in entry]
+            if entries:
                 # Split log entries by newlines
-                log_lines = log_data['l'].split('\\n')
-                log_lines = [line.strip() for line in log_lines if line.strip()]
+                log_lines = [
+                    line.strip()
+                    for entry in entries
+                    for line in entry.split('\\n')
+                    if line.strip()
+                ]
                 
                 if log_lines:
                     result += f"🔍 Found {len(log_lines)} log entries:\n\n"
-                    for i, line in enumerate(log_lines, 1):
-                        # Basic formatting to make logs more readable
-                        if '|' in line:
-                            parts = line.split('|', 3)
-                            if len(parts) >= 3:
-                                timestamp = parts[0].strip()
-                                level = parts[1].strip()
-                                message = '|'.join(parts[2:]).strip()
-                                result += f"**{i}.** `{timestamp}` [{level}] {message}\n"
-                            else:
-                                result += f"**{i}.** {line}\n"
-                        else:
-                            result += f"**{i}.** {line}\n"
+                    result += "\n".join(_format_log_lines(log_lines)) + "\n"
                 else:
                     result += "ℹ️ No log entries found"
             else:
@@ -3223,7 +3441,8 @@ async def _get_instance_logs(args: dict) -> list[TextContent]:
         result += f"\n\n💡 **Tip**: Use different parameters to filter results:\n"
         result += f"- `lines`: Number of entries (1-100)\n"
         result += f"- `reverse`: true for newest first, false for oldest first\n"
-        result += f"- `begin_pos`: Starting position in log file"
+        result += f"- `begin_pos`: Starting position in log file\n"
+        result += "- `pages`: Consecutive pages of `lines` entries to fetch (1-10)"
         
         return [TextContent(type="text", text=result)]
     except Exception as e:
@@ -3231,7 +3450,18 @@ async def _get_instance_logs(args: dict) -> list[TextContent]:
 
 def main():
     """Entry point for setuptools."""
-    asyncio.run(run_server())
+    # Log calls only enqueue records; a listener thread writes them to stderr
+    # so tool handlers on the event loop never block on the terminal
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    log_listener = QueueListener(log_queue, logging.StreamHandler(sys.stderr))
+    # force=True replaces the stderr handler installed at import time
+    logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(log_queue)], force=True)
+    log_listener.start()
+    try:
+        asyncio.run(run_server())
+    finally:
+        # Drain queued records before the process exits
+        log_listener.stop()
 
 if __name__ == "__main__":
     main() 
@@ -0,0 +1,158 @@
+"""Unit tests for the dynamic-credential connection pool."""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+import ts3
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from teamspeak_mcp import server
+
+
+class FakeTS3Connection:
+    """Stand-in for ts3.query.TS3Connection that tracks concurrent queries."""
+
+    instances = []
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.closed = False
+        self.fail_with = None
+        FakeTS3Connection.instances.append(self)
+
+    def use(self, sid):
+        pass
+
+    def login(self, client_login_name, client_login_password):
+        pass
+
+    def whoami(self):
+        pass
+
+    def quit(self):
+        self.closed = True
+
+    def serverinfo(self):
+        with FakeTS3Connection.lock:
+            FakeTS3Connection.active += 1
+            FakeTS3Connection.max_active = max(FakeTS3Connection.max_active, FakeTS3Connection.active)
+        try:
+            time.sleep(0.02)
+            if self.fail_with is not None:
+                raise self.fail_with
+            return [{"virtualserver_name": self.host}]
+        finally:
+            with FakeTS3Connection.lock:
+                FakeTS3Connection.active -= 1
+
+
+@pytest.fixture(autouse=True)
+def fake_ts3():
+    """Swap in the fake connection class and start from an empty pool."""
+    FakeTS3Connection.instances = []
+    FakeTS3Connection.active = 0
+    FakeTS3Connection.max_active = 0
+    server._connection_pool.clear()
+    with patch.object(ts3.query, "TS3Connection", FakeTS3Connection):
+        yield
+    server._connection_pool.clear()
+
+
+def _args(host="ts.example.com"):
+    return {"teamspeak_credentials": {"host": host, "password": "secret"}}
+
+
+async def _closed():
+    """Wait for connections evicted from the pool to finish disconnecting."""
+    await asyncio.gather(*server._closing_connections)
+
+
+async def _server_info(args):
+    """Run the server_info tool the way handle_call_tool does."""
+    async with server._borrowed_connection(args):
+        return await server._server_info(args)
+
+
+def test_pool_reuses_connection_for_same_credentials():
+    async def run():
+        await _server_info(_args())
+        await _server_info(_args())
+
+    asyncio.run(run())
+    assert len(FakeTS3Connection.instances) == 1
+    assert len(server._connection_pool) == 1
+
+
+def test_concurrent_borrows_never_share_a_connection_at_once():
+    async def run():
+        await asyncio.gather(*(_server_info(_args()) for _ in range(4)))
+
+    asyncio.run(run())
+    assert len(FakeTS3Connection.instances) == 1
+    assert FakeTS3Connection.max_active == 1
+
+
+def test_idle_connections_expire():
+    async def run():
+        await _server_info(_args())
+        with patch.object(server, "CONNECTION_IDLE_TTL", 0.0):
+            await _server_info(_args("other.example.com"))
+        await _closed()
+
+    asyncio.run(run())
+    first, second = FakeTS3Connection.instances
+    assert first.closed
+    assert [key[0] for key in server._connection_pool] == ["other.example.com"]
+
+
+def test_least_recently_used_connection_is_evicted():
+    async def run():
+        with patch.object(server, "CONNECTION_POOL_SIZE", 2):
+            for host in ("a.example.com", "b.example.com", "c.example.com"):
+                await _server_info(_args(host))
+            await _closed()
+
+    asyncio.run(run())
+    assert [conn.closed for conn in FakeTS3Connection.instances] == [True, False, False]
+    assert [key[0] for key in server._connection_pool] == ["b.example.com", "c.example.com"]
+
+
+def test_eviction_waits_for_borrowed_connection():
+    async def run():
+        args = _args("a.example.com")
+        async with server._borrowed_connection(args):
+            await server._server_info(args)
+            with patch.object(server, "CONNECTION_POOL_SIZE", 1):
+                await _server_info(_args("b.example.com"))
+            await _closed()
+            assert not FakeTS3Connection.instances[0].closed
+        await _closed()
+        assert FakeTS3Connection.instances[0].closed
+
+    asyncio.run(run())
+
+
+def test_transport_error_drops_connection_from_pool():
+    async def run():
+        await _server_info(_args())
+        FakeTS3Connection.instances[0].fail_with = ts3.query.TS3RecvError()
+        with pytest.raises(Exception):
+            await _server_info(_args())
+        await _closed()
+        assert not server._connection_pool
+        await _server_info(_args())
+
+    asyncio.run(run())
+    assert len(FakeTS3Connection.instances) == 2
+    assert FakeTS3Connection.instances[0].closed
@@ -0,0 +1,81 @@
+"""Unit tests for paging through instance logs."""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from teamspeak_mcp import server
+
+
+class FakeLogResponse:
+    def __init__(self, parsed):
+        self.parsed = parsed
+
+
+class FakeQuery:
+    """Stand-in connection serving a fixed sequence of logview pages."""
+
+    def __init__(self, pages):
+        self.pages = list(pages)
+        self.calls = []
+
+    def logview(self, **kwargs):
+        self.calls.append(kwargs)
+        return FakeLogResponse(self.pages.pop(0) if self.pages else [])
+
+
+@pytest.fixture
+def query(monkeypatch):
+    """Install a connected global connection and return its fake query object."""
+    fake = FakeQuery([
+        [{"last_pos": "300", "l": "2024-01-01 10:00:00|INFO |VirtualServer |1| third"}],
+        [{"last_pos": "200", "l": "2024-01-01 09:00:00|INFO |VirtualServer |1| second"}],
+        [{"last_pos": "100", "l": "2024-01-01 08:00:00|INFO |VirtualServer |1| first"}],
+    ])
+    connection = server.TeamSpeakConnection()
+    connection.connection = fake
+    monkeypatch.setattr(server, "ts_connection", connection)
+    return fake
+
+
+def _logs(args):
+    [content] = asyncio.run(server._get_instance_logs(args))
+    return content.text
+
+
+def test_pages_continue_from_previous_last_pos(query):
+    text = _logs({"lines": 10, "pages": 3, "begin_pos": 400})
+
+    assert [call.get("begin_pos") for call in query.calls] == [400, "300", "200"]
+    assert "3 pages of 10 entries" in text
+    assert "third" in text and "first" in text
+
+
+def test_paging_stops_at_empty_page(query):
+    text = _logs({"lines": 10, "pages": 10})
+
+    assert len(query.calls) == 4
+    assert "3 pages of 10 entries" in text
+
+
+@pytest.mark.parametrize("pages, expected_calls", [(None, 1), ("abc", 1), (0, 1), (-5, 1), (2, 2), ("2", 2)])
+def test_pages_argument_is_clamped(query, pages, expected_calls):
+    _logs({"pages": pages})
+
+    assert len(query.calls) == expected_calls
+
+
+def test_pages_argument_caps_at_ten(monkeypatch):
+    fake = FakeQuery([[{"last_pos": str(1000 - i), "l": f"entry {i}"}] for i in range(20)])
+    connection = server.TeamSpeakConnection()
+    connection.connection = fake
+    monkeypatch.setattr(server, "ts_connection", connection)
+
+    _logs({"pages": 50})
+
+    assert len(fake.calls) == 10
@@ -0,0 +1,75 @@
+"""Unit tests for saving server snapshots to the snapshot directory."""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from teamspeak_mcp import server
+
+
+class FakeSnapshotResponse:
+    """Stand-in for the serversnapshotcreate response."""
+
+    data = [b"hash=abc virtualserver_name=Test", b"error id=0 msg=ok"]
+    parsed = [{"hash": "abc", "virtualserver_name": "Test"}]
+
+
+class FakeQuery:
+    def serversnapshotcreate(self):
+        return FakeSnapshotResponse()
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, monkeypatch):
+    """Point TEAMSPEAK_SNAPSHOT_DIR at a temporary directory."""
+    directory = tmp_path / "snapshots"
+    monkeypatch.setenv("TEAMSPEAK_SNAPSHOT_DIR", str(directory))
+    return directory
+
+
+@pytest.fixture
+def connected(monkeypatch):
+    """Use a connected global connection backed by FakeQuery."""
+    connection = server.TeamSpeakConnection()
+    connection.connection = FakeQuery()
+    monkeypatch.setattr(server, "ts_connection", connection)
+
+
+def test_resolve_snapshot_path_accepts_files_inside_directory(snapshot_dir):
+    assert server._resolve_snapshot_path("backup.snap") == (snapshot_dir / "backup.snap").resolve()
+    assert server._resolve_snapshot_path("daily/backup.snap") == (snapshot_dir / "daily" / "backup.snap").resolve()
+
+
+@pytest.mark.parametrize("path", ["../backup.snap", "daily/../../backup.snap", "/etc/passwd", ".", ""])
+def test_resolve_snapshot_path_rejects_paths_outside_directory(snapshot_dir, path):
+    with pytest.raises(ValueError):
+        server._resolve_snapshot_path(path)
+
+
+def test_resolve_snapshot_path_rejects_absolute_path_to_sibling_directory(snapshot_dir):
+    with pytest.raises(ValueError):
+        server._resolve_snapshot_path(str(snapshot_dir) + "-other/backup.snap")
+
+
+def test_create_snapshot_writes_raw_snapshot(snapshot_dir, connected):
+    asyncio.run(server._create_server_snapshot({"save_to_path": "backup.snap"}))
+
+    assert (snapshot_dir / "backup.snap").read_text(encoding="utf-8") == "hash=abc virtualserver_name=Test"
+
+
+@pytest.mark.parametrize("overwrite", [None, False, "false", "true", 1])
+def test_create_snapshot_only_overwrites_when_flag_is_true(snapshot_dir, connected, overwrite):
+    snapshot_dir.mkdir()
+    (snapshot_dir / "backup.snap").write_text("previous", encoding="utf-8")
+
+    with pytest.raises(Exception, match="already exists"):
+        asyncio.run(server._create_server_snapshot({"save_to_path": "backup.snap", "overwrite": overwrite}))
+    assert (snapshot_dir / "backup.snap").read_text(encoding="utf-8") == "previous"
+
+    asyncio.run(server._create_server_snapshot({"save_to_path": "backup.snap", "overwrite": True}))
+    assert (snapshot_dir / "backup.snap").read_text(encoding="utf-8") == "hash=abc virtualserver_name=Test"
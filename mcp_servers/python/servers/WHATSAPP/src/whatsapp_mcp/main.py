@@ -3,16 +3,25 @@
 
 import asyncio
 import logging
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 
 import click
 
 from whatsapp_mcp.server import main as server_main
 
+# Log calls only enqueue records; a listener thread writes them to stderr so
+# handlers on the event loop never block on the terminal
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, logging.StreamHandler(sys.stderr))
+
+# force=True replaces the stderr handler installed when the server module is imported
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler(sys.stderr)],
+    handlers=[QueueHandler(_log_queue)],
+    force=True,
 )
 logger = logging.getLogger(__name__)
 
@@ -27,13 +36,17 @@ def main(debug: bool) -> None:
         logging.getLogger().setLevel(logging.DEBUG)
 
     # Run the server
+    _log_listener.start()
     try:
         asyncio.run(server_main())
     except KeyboardInterrupt:
         logger.info("Server stopped by user")
     except Exception as e:
-        logger.error(f"Fatal error: {e}")
+        logger.error("Fatal error: %s", e)
         sys.exit(1)
+    finally:
+        # Drain queued records before the process exits
+        _log_listener.stop()
 
 
 if __name__ == "__main__":
@@ -1,20 +1,116 @@
 """Authentication module for WhatsApp MCP Server."""
 
+import asyncio
+import functools
 import logging
 import os
-from typing import Dict, Tuple, Any, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from types import ModuleType
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
 
+import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 # Import the WhatsApp API client
+import whatsapp_api_client_python.response
 from whatsapp_api_client_python.API import GreenApi
 
+_orjson: Optional[ModuleType]
+try:
+    import orjson as _orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    _orjson = None
+else:
+    # GreenAPI responses are decoded with json.loads imported into the SDK's
+    # response module; orjson parses the same payloads several times faster
+    whatsapp_api_client_python.response.loads = _orjson.loads
+
 # Load environment variables
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Validated GreenAPI clients keyed by (id_instance, api_token), reused for
+# _CREDENTIAL_TTL seconds so reopening a session skips the getSettings round-trip.
+_CREDENTIAL_TTL = 300.0
+_CREDENTIAL_CACHE: Dict[Tuple[str, str], Tuple[float, GreenApi]] = {}
+# [lock, number of holders and waiters] per credential set, so concurrent opens
+# of one account validate once while different accounts validate in parallel
+_CREDENTIAL_LOCKS: Dict[Tuple[str, str], List[Any]] = {}
+
+
+@asynccontextmanager
+async def _credential_lock(key: Tuple[str, str]) -> AsyncIterator[None]:
+    """Serialize validation of one credential set, dropping the lock once unused."""
+    entry = _CREDENTIAL_LOCKS.get(key)
+    if entry is None:
+        entry = _CREDENTIAL_LOCKS[key] = [asyncio.Lock(), 0]
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if not entry[1]:
+            del _CREDENTIAL_LOCKS[key]
+
+
+def _get_cached_client(key: Tuple[str, str]) -> Optional[GreenApi]:
+    """Return a previously validated client, evicting expired entries."""
+    now = time.monotonic()
+    for cached_key, (validated_at, _) in list(_CREDENTIAL_CACHE.items()):
+        if now - validated_at >= _CREDENTIAL_TTL:
+            del _CREDENTIAL_CACHE[cached_key]
+
+    entry = _CREDENTIAL_CACHE.get(key)
+    return entry[1] if entry else None
+
+
+_T = TypeVar("_T")
+
+# GreenAPI calls run on a dedicated worker pool no larger than the HTTP
+# connection pool, so every in-flight request can reuse a kept-alive connection
+_HTTP_POOL_SIZE = 10
+_API_EXECUTOR = ThreadPoolExecutor(max_workers=_HTTP_POOL_SIZE, thread_name_prefix="greenapi")
+
+
+async def call_api(func: Callable[..., _T], *args: Any, **kwargs: Any) -> _T:
+    """Run a blocking GreenAPI SDK call on the API worker pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_API_EXECUTOR, functools.partial(func, *args, **kwargs))
+
+
+def _keep_alive_session() -> requests.Session:
+    """Build a pooled HTTP session for GreenAPI calls.
+
+    The SDK's own session sends ``Connection: close``, forcing a new TLS
+    handshake on every request; this one keeps connections open for reuse.
+    Rate-limited (429) requests back off and retry exactly as the SDK's do,
+    but a request whose response failed to arrive is never resent, since
+    GreenAPI may already have delivered the message.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=_HTTP_POOL_SIZE,
+        pool_maxsize=_HTTP_POOL_SIZE,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=1.0,
+            allowed_methods=None,
+            status_forcelist=[429],
+            read=0,
+            other=0,
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
 
 class WhatsAppClient:
     """WhatsApp client implementation using whatsapp-api-client-python."""
@@ -43,32 +139,45 @@ class WhatsAppClient:
                 )
                 return False
 
-            self.client = GreenApi(
-                idInstance=id_instance, apiTokenInstance=api_token_instance
-            )
-            
-            # Test the connection by getting account settings
-            try:
-                settings = self.client.account.getSettings()
-                if settings:
-                    logger.info("WhatsApp client initialized successfully")
+            key = (id_instance, api_token_instance)
+            async with _credential_lock(key):
+                cached_client = _get_cached_client(key)
+                if cached_client is not None:
+                    logger.info("WhatsApp client initialized from cached credential validation")
+                    self.client = cached_client
                     self.is_authenticated = True
                     return True
-                else:
-                    logger.error("Failed to get account settings - invalid credentials")
+
+                self.client = GreenApi(
+                    idInstance=id_instance, apiTokenInstance=api_token_instance
+                )
+                self.client.session = _keep_alive_session()
+
+                # Test the connection by getting account settings
+                try:
+                    settings = await call_api(self.client.account.getSettings)
+                    if settings:
+                        logger.info("WhatsApp client initialized successfully")
+                        _CREDENTIAL_CACHE[key] = (time.monotonic(), self.client)
+                        self.is_authenticated = True
+                        return True
+                    else:
+                        logger.error("Failed to get account settings - invalid credentials")
+                        return False
+                except Exception as e:
+                    logger.error("Failed to validate credentials: %s", e)
                     return False
-            except Exception as e:
-                logger.error(f"Failed to validate credentials: {e}")
-                return False
-                
+
         except Exception as e:
-            logger.error(f"Failed to initialize WhatsApp client: {e}")
+            logger.error("Failed to initialize WhatsApp client: %s", e)
             return False
 
 
 class AuthManager:
     """Manager for authentication-related operations."""
 
+    __slots__ = ("session",)
+
     def __init__(self) -> None:
         self.session: WhatsAppClient | None = None
 
@@ -107,7 +216,8 @@ class AuthManager:
 
     def is_authenticated(self) -> bool:
         """Check if a session is authenticated."""
-        return self.session is not None and self.session.is_authenticated
+        session = self.session
+        return session is not None and session.is_authenticated
 
     def get_client(self) -> WhatsAppClient | None:
         """Get the client for a session."""
@@ -118,12 +228,16 @@ class AuthManager:
         if not self.session:
             return False, "No active session to close"
         
+        if self.session.client is not None:
+            # Drop pooled connections; the cached client reopens them on next use
+            self.session.client.session.close()
         self.session = None
         return True, "Session closed successfully"
 
     def get_session_status(self) -> Dict[str, Any]:
         """Get the current session status."""
-        if not self.session:
+        session = self.session
+        if not session:
             return {
                 "authenticated": False,
                 "state": "DISCONNECTED",
@@ -131,11 +245,47 @@ class AuthManager:
             }
         
         return {
-            "authenticated": self.session.is_authenticated,
-            "state": self.session.state,
-            "message": "Session active" if self.session.is_authenticated else "Session not authenticated"
+            "authenticated": session.is_authenticated,
+            "state": session.state,
+            "message": "Session active" if session.is_authenticated else "Session not authenticated"
         }
 
 
 # Create a singleton instance
 auth_manager = AuthManager()
+
+
+def shutdown() -> None:
+    """Close pooled GreenAPI connections and stop the API worker pool."""
+    clients = {id(client): client for _, client in _CREDENTIAL_CACHE.values()}
+    if auth_manager.session is not None and auth_manager.session.client is not None:
+        clients[id(auth_manager.session.client)] = auth_manager.session.client
+    for client in clients.values():
+        client.session.close()
+    _CREDENTIAL_CACHE.clear()
+    _API_EXECUTOR.shutdown(wait=False, cancel_futures=True)
+
+
+def require_client() -> GreenApi:
+    """Get the active session's GreenAPI client.
+
+    Raises ValueError when there is no session or its client is not initialized.
+    """
+    whatsapp_client = auth_manager.session
+    if not whatsapp_client:
+        raise ValueError("Session not found")
+    if not whatsapp_client.client:
+        raise ValueError("WhatsApp client not initialized")
+    return whatsapp_client.client
+
+
+def require_session(func: Callable[..., Awaitable[_T]]) -> Callable[..., Awaitable[_T]]:
+    """Pass the active session's GreenAPI client to ``func`` as its first argument.
+
+    Raises ValueError when there is no session or its client is not initialized.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> _T:
+        return await func(require_client(), *args, **kwargs)
+
+    return wrapper
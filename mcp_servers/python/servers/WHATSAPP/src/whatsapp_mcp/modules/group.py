@@ -1,76 +1,86 @@
 """Group module for WhatsApp MCP Server."""
 
-import asyncio
+import functools
 import json
 import logging
+import time
 import uuid
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from whatsapp_api_client_python.API import GreenApi
 
 from whatsapp_mcp.models import Contact, Group, Participant
-from whatsapp_mcp.modules.auth import auth_manager
+from whatsapp_mcp.modules.auth import call_api, require_session
+from whatsapp_mcp.utils import now_iso
 
 logger = logging.getLogger(__name__)
 
 
+# Participants keyed by (id_instance, group_id), reused for _PARTICIPANTS_TTL
+# seconds, kept in LRU order and dropped whenever this server changes the
+# group's membership
+_PARTICIPANTS_TTL = 30.0
+_PARTICIPANTS_CACHE_SIZE = 256
+_PARTICIPANTS_CACHE: "OrderedDict[Tuple[str, str], Tuple[float, List[Participant]]]" = OrderedDict()
+
+_CONTACT_SUFFIX = "@c.us"
+_PLUS_TRANS = str.maketrans("", "", "+")
+
+
+@functools.lru_cache(maxsize=4096)
 def _format_phone_number(phone: str) -> str:
     """Format phone number for WhatsApp API."""
-    phone = phone.strip().replace("+", "")
-    if not phone.endswith("@c.us"):
-        return f"{phone}@c.us"
-    return phone
+    phone = phone.strip().translate(_PLUS_TRANS)
+    return phone if phone.endswith(_CONTACT_SUFFIX) else phone + _CONTACT_SUFFIX
 
 
-async def create_group(group_name: str, participants: List[str]) -> Group:
+@require_session
+async def create_group(green_api: GreenApi, group_name: str, participants: List[str]) -> Group:
     """Create a new WhatsApp group using GreenAPI."""
-    logger.info(f"Creating group '{group_name}' with {len(participants)} participants")
-
-    whatsapp_client = auth_manager.get_client()
-    if not whatsapp_client:
-        raise ValueError("Session not found")
-
-    if not whatsapp_client.client:
-        raise ValueError("WhatsApp client not initialized")
+    logger.info("Creating group '%s' with %s participants", group_name, len(participants))
 
     if len(participants) < 1:
         raise ValueError("Need at least one participant to create a group")
 
     try:
         # Format participant phone numbers correctly
-        formatted_participants = [_format_phone_number(phone) for phone in participants]
+        formatted_participants = list(map(_format_phone_number, participants))
         
-        logger.debug(f"Creating group with participants: {formatted_participants}")
+        logger.debug("Creating group with participants: %s", formatted_participants)
 
-        # Use GreenAPI's createGroup method
-        response = whatsapp_client.client.groups.createGroup(
+        # Use GreenAPI's createGroup method off the event loop
+        response = await call_api(
+            green_api.groups.createGroup,
             groupName=group_name,
             chatIds=formatted_participants
         )
 
-        logger.info(f"Group creation response code: {response.code}")
-        logger.info(f"Group creation response data: {response.data}")
+        logger.info("Group creation response code: %s", response.code)
+        logger.debug("Group creation response data: %s", response.data)
 
         if response.code == 200 and response.data:
             # Extract group information from response
             group_data = response.data
             group_id = group_data.get("chatId", f"group_{uuid.uuid4().hex[:8]}")
             
-            # Create Group object
+            # Create Group object; participant fields are already normalized
+            # strings, so skip re-validating them
             group = Group(
                 id=group_id,
                 name=group_name,
                 participants=[
-                    Participant(
+                    Participant.model_construct(
                         id=phone,
                         name=phone.split("@")[0],  # Use phone number as name
                         role="member"
                     ) for phone in formatted_participants
                 ],
-                created_at=datetime.now().isoformat(),
+                created_at=now_iso(),
                 created_by="current_user"
             )
             
-            logger.info(f"Group '{group_name}' created successfully with ID: {group_id}")
+            logger.info("Group '%s' created successfully with ID: %s", group_name, group_id)
             return group
         else:
             error_msg = f"Failed to create group. Response code: {response.code}, Data: {response.data}"
@@ -78,161 +88,161 @@ async def create_group(group_name: str, participants: List[str]) -> Group:
             raise Exception(error_msg)
 
     except Exception as e:
-        logger.error(f"Failed to create group '{group_name}': {e}")
+        logger.error("Failed to create group '%s': %s", group_name, e)
         # Return a Group object with error information
         return Group(
             id="error",
             name=group_name,
             participants=[],
-            created_at=datetime.now().isoformat(),
+            created_at=now_iso(),
             created_by="error",
             error=str(e)
         )
 
 
-async def get_group_participants(group_id: str) -> List[Participant]:
-    """Get participants of a WhatsApp group using GreenAPI."""
-    logger.info(f"Getting participants for group: {group_id}")
+def _store_participants(key: Tuple[str, str], participants: List[Participant]) -> None:
+    """Cache a participants list, dropping expired and least recently used entries."""
+    now = time.monotonic()
+    for stale in [k for k, (stamp, _) in _PARTICIPANTS_CACHE.items() if now - stamp >= _PARTICIPANTS_TTL]:
+        del _PARTICIPANTS_CACHE[stale]
+    _PARTICIPANTS_CACHE[key] = (now, participants)
+    _PARTICIPANTS_CACHE.move_to_end(key)
+    if len(_PARTICIPANTS_CACHE) > _PARTICIPANTS_CACHE_SIZE:
+        _PARTICIPANTS_CACHE.popitem(last=False)
+
 
-    whatsapp_client = auth_manager.get_client()
-    if not whatsapp_client:
-        raise ValueError("Session not found")
+@require_session
+async def get_group_participants(green_api: GreenApi, group_id: str) -> List[Participant]:
+    """Get participants of a WhatsApp group using GreenAPI."""
+    logger.info("Getting participants for group: %s", group_id)
 
-    if not whatsapp_client.client:
-        raise ValueError("WhatsApp client not initialized")
+    key = (green_api.idInstance, group_id)
+    now = time.monotonic()
+    entry = _PARTICIPANTS_CACHE.get(key)
+    if entry and now - entry[0] < _PARTICIPANTS_TTL:
+        _PARTICIPANTS_CACHE.move_to_end(key)
+        logger.debug("Using cached participants for group %s", group_id)
+        return list(entry[1])
 
     try:
-        # Use GreenAPI's getGroupData method
-        response = whatsapp_client.client.groups.getGroupData(group_id)
+        # Use GreenAPI's getGroupData method off the event loop
+        response = await call_api(green_api.groups.getGroupData, group_id)
 
-        logger.info(f"Group data response code: {response.code}")
-        logger.info(f"Group data response: {response.data}")
+        logger.info("Group data response code: %s", response.code)
+        logger.debug("Group data response: %s", response.data)
 
-        participants = []
-        
         if response.code == 200 and response.data:
             group_data = response.data
             
             # Extract participants from group data
-            if "participants" in group_data:
-                for participant_data in group_data["participants"]:
-                    participant = Participant(
-                        id=participant_data.get("id", "unknown"),
-                        name=participant_data.get("name", participant_data.get("id", "Unknown")),
-                        role=participant_data.get("isAdmin", False) and "admin" or "member"
-                    )
-                    participants.append(participant)
-            else:
-                logger.warning(f"No participants found in group data for {group_id}")
+            if "participants" not in group_data:
+                logger.warning("No participants found in group data for %s", group_id)
+            # GreenAPI already returns well-formed participant records, so
+            # build the models without re-validating each field
+            participants = [
+                Participant.model_construct(
+                    id=p.get("id", "unknown"),
+                    name=p.get("name") or p.get("id", "Unknown"),
+                    role="admin" if p.get("isAdmin") else "member"
+                ) for p in group_data.get("participants", ())
+            ]
         else:
             error_msg = f"Failed to get group data. Response code: {response.code}, Data: {response.data}"
             logger.error(error_msg)
             raise Exception(error_msg)
 
-        logger.info(f"Retrieved {len(participants)} participants for group {group_id}")
-        return participants
+        logger.info("Retrieved %s participants for group %s", len(participants), group_id)
+        _store_participants(key, participants)
+        return list(participants)
 
     except Exception as e:
-        logger.error(f"Failed to get participants for group {group_id}: {e}")
+        logger.error("Failed to get participants for group %s: %s", group_id, e)
         # Return empty list on error
         return []
 
 
-async def add_participant_to_group(group_id: str, participant_phone: str) -> bool:
+@require_session
+async def add_participant_to_group(green_api: GreenApi, group_id: str, participant_phone: str) -> bool:
     """Add a participant to a WhatsApp group using GreenAPI."""
-    logger.info(f"Adding participant {participant_phone} to group {group_id}")
-
-    whatsapp_client = auth_manager.get_client()
-    if not whatsapp_client:
-        raise ValueError("Session not found")
-
-    if not whatsapp_client.client:
-        raise ValueError("WhatsApp client not initialized")
+    logger.info("Adding participant %s to group %s", participant_phone, group_id)
 
     try:
         formatted_phone = _format_phone_number(participant_phone)
         
-        # Use GreenAPI's addGroupParticipant method
-        response = whatsapp_client.client.groups.addGroupParticipant(
+        # Use GreenAPI's addGroupParticipant method off the event loop
+        response = await call_api(
+            green_api.groups.addGroupParticipant,
             groupId=group_id,
             participantChatId=formatted_phone
         )
 
-        logger.info(f"Add participant response code: {response.code}")
-        logger.info(f"Add participant response: {response.data}")
+        logger.info("Add participant response code: %s", response.code)
+        logger.debug("Add participant response: %s", response.data)
 
         if response.code == 200:
-            logger.info(f"Successfully added {formatted_phone} to group {group_id}")
+            _PARTICIPANTS_CACHE.pop((green_api.idInstance, group_id), None)
+            logger.info("Successfully added %s to group %s", formatted_phone, group_id)
             return True
         else:
-            logger.error(f"Failed to add participant. Response code: {response.code}, Data: {response.data}")
+            logger.error("Failed to add participant. Response code: %s, Data: %s", response.code, response.data)
             return False
 
     except Exception as e:
-        logger.error(f"Failed to add participant {participant_phone} to group {group_id}: {e}")
+        logger.error("Failed to add participant %s to group %s: %s", participant_phone, group_id, e)
         return False
 
 
-async def remove_participant_from_group(group_id: str, participant_phone: str) -> bool:
+@require_session
+async def remove_participant_from_group(green_api: GreenApi, group_id: str, participant_phone: str) -> bool:
     """Remove a participant from a WhatsApp group using GreenAPI."""
-    logger.info(f"Removing participant {participant_phone} from group {group_id}")
-
-    whatsapp_client = auth_manager.get_client()
-    if not whatsapp_client:
-        raise ValueError("Session not found")
-
-    if not whatsapp_client.client:
-        raise ValueError("WhatsApp client not initialized")
+    logger.info("Removing participant %s from group %s", participant_phone, group_id)
 
     try:
         formatted_phone = _format_phone_number(participant_phone)
         
-        # Use GreenAPI's removeGroupParticipant method
-        response = whatsapp_client.client.groups.removeGroupParticipant(
+        # Use GreenAPI's removeGroupParticipant method off the event loop
+        response = await call_api(
+            green_api.groups.removeGroupParticipant,
             groupId=group_id,
             participantChatId=formatted_phone
         )
 
-        logger.info(f"Remove participant response code: {response.code}")
-        logger.info(f"Remove participant response: {response.data}")
+        logger.info("Remove participant response code: %s", response.code)
+        logger.debug("Remove participant response: %s", response.data)
 
         if response.code == 200:
-            logger.info(f"Successfully removed {formatted_phone} from group {group_id}")
+            _PARTICIPANTS_CACHE.pop((green_api.idInstance, group_id), None)
+            logger.info("Successfully removed %s from group %s", formatted_phone, group_id)
             return True
         else:
-            logger.error(f"Failed to remove participant. Response code: {response.code}, Data: {response.data}")
+            logger.error("Failed to remove participant. Response code: %s, Data: %s", response.code, response.data)
             return False
 
     except Exception as e:
-        logger.error(f"Failed to remove participant {participant_phone} from group {group_id}: {e}")
+        logger.error("Failed to remove participant %s from group %s: %s", participant_phone, group_id, e)
         return False
 
 
-async def leave_group(group_id: str) -> bool:
+@require_session
+async def leave_group(green_api: GreenApi, group_id: str) -> bool:
     """Leave a WhatsApp group using GreenAPI."""
-    logger.info(f"Leaving group {group_id}")
-
-    whatsapp_client = auth_manager.get_client()
-    if not whatsapp_client:
-        raise ValueError("Session not found")
-
-    if not whatsapp_client.client:
-        raise ValueError("WhatsApp client not initialized")
+    logger.info("Leaving group %s", group_id)
 
     try:
-        # Use GreenAPI's leaveGroup method
-        response = whatsapp_client.client.groups.leaveGroup(group_id)
+        # Use GreenAPI's leaveGroup method off the event loop
+        response = await call_api(green_api.groups.leaveGroup, group_id)
 
-        logger.info(f"Leave group response code: {response.code}")
-        logger.info(f"Leave group response: {response.data}")
+        logger.info("Leave group response code: %s", response.code)
+        logger.debug("Leave group response: %s", response.data)
 
         if response.code == 200:
-            logger.info(f"Successfully left group {group_id}")
+            _PARTICIPANTS_CACHE.pop((green_api.idInstance, group_id), None)
+            logger.info("Successfully left group %s", group_id)
             return True
         else:
-            logger.error(f"Failed to leave group. Response code: {response.code}, Data: {response.data}")
+            logger.error("Failed to leave group. Response code: %s, Data: %s", response.code, response.data)
             return False
 
     except Exception as e:
-        logger.error(f"Failed to leave group {group_id}: {e}")
+        logger.error("Failed to leave group %s: %s", group_id, e)
         return False
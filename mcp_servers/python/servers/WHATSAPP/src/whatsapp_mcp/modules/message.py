@@ -1,86 +1,181 @@
 """Message module for WhatsApp MCP Server with fixed group/contact handling."""
 
+import asyncio
+import functools
+import itertools
 import logging
+import os
+import time
 import uuid
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Callable, Dict, List, NamedTuple, Optional, Tuple
 
-from whatsapp_mcp.modules.auth import auth_manager
+from whatsapp_api_client_python.API import GreenApi
+
+from whatsapp_mcp.modules.auth import call_api, require_client
+from whatsapp_mcp.utils import iso_from_timestamp, now_iso
 
 logger = logging.getLogger(__name__)
 
 
+_GROUP_SUFFIX = "@g.us"
+_CONTACT_SUFFIX = "@c.us"
+# Chat IDs that already carry a group or contact suffix are used as given
+_CHAT_SUFFIXES = frozenset({_GROUP_SUFFIX, _CONTACT_SUFFIX})
+_GROUP_TYPE = "group"
+_CONTACT_TYPE = "contact"
+# Bare numeric IDs longer than this are groups
+_GROUP_MIN_LEN = 15
+_PLUS_TRANS = str.maketrans("", "", "+")
+
+
+def _make_chat_id_fn(country_code: str, local_len: int) -> Callable[[str], str]:
+    """Build a cached chat ID formatter for a deployment's default country code.
+
+    Bare numbers of ``local_len`` digits that don't already start with
+    ``country_code`` get it prepended; an empty ``country_code`` disables this.
+    """
+    @functools.lru_cache(maxsize=4096)
+    def chat_id_for(phone_number: str) -> str:
+        """Get the chat ID for an already cleaned phone number or group ID."""
+        # Already formatted, or not a bare number: return as is
+        if phone_number[-5:] in _CHAT_SUFFIXES or not phone_number.isdigit():
+            return phone_number
+
+        length = len(phone_number)
+        # Long numeric IDs are groups
+        if length > _GROUP_MIN_LEN:
+            return phone_number + _GROUP_SUFFIX
+        # A local number without its country code gets the default prefix
+        if length == local_len and not phone_number.startswith(country_code):
+            return country_code + phone_number + _CONTACT_SUFFIX
+        # Any other number is already international
+        return phone_number + _CONTACT_SUFFIX
+
+    return chat_id_for
+
+
+# Defaults keep the original behaviour for Indian (+91, 10-digit) numbers
+_chat_id_for = _make_chat_id_fn(
+    os.getenv("WHATSAPP_DEFAULT_CC", "91"), int(os.getenv("WHATSAPP_LOCAL_LEN", "10"))
+)
+
+
 def _get_chat_id(phone_number: str) -> str:
     """Get the chat ID for a phone number or group ID."""
-    # Remove the country code symbol and clean the number
-    phone_number = phone_number.strip().replace("+", "")
-    
-    # If the number already has @g.us suffix (group), return as is
-    if phone_number.endswith("@g.us"):
+    # IDs returned by earlier calls are already canonical: skip normalization
+    if phone_number[-5:] in _CHAT_SUFFIXES and phone_number[:1].isdigit():
         return phone_number
-    
-    # If the number already has @c.us suffix (contact), return as is
-    if phone_number.endswith("@c.us"):
-        return phone_number
-    
-    # If it's a group ID pattern (long number), add @g.us
-    if len(phone_number) > 15 and phone_number.isdigit():
-        return f"{phone_number}@g.us"
-    
-    # For regular phone numbers, ensure proper format for GreenAPI
-    if phone_number.isdigit():
-        # If it's an Indian number starting with 91, keep as is
-        if phone_number.startswith("91") and len(phone_number) == 12:
-            return f"{phone_number}@c.us"
-        # If it's a 10-digit Indian number, add 91 prefix
-        elif len(phone_number) == 10 and not phone_number.startswith("91"):
-            return f"91{phone_number}@c.us"
-        # For other international numbers, keep as is
-        else:
-            return f"{phone_number}@c.us"
-    
-    # If already formatted correctly, return as is
-    return phone_number
+    # Remove the country code symbol and clean the number, so that spelling
+    # variants of the same number share one cache entry
+    return _chat_id_for(phone_number.strip().translate(_PLUS_TRANS))
+
+
+# Parsed history pages keyed by (id_instance, chat_id, count), so one account
+# never sees another's messages, reused for _HISTORY_TTL seconds, kept in LRU
+# order and dropped when a message is sent to the chat
+_HISTORY_TTL = 10.0
+_HISTORY_CACHE_SIZE = 256
+_HISTORY_CACHE: "OrderedDict[Tuple[str, str, int], Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+
+_BASE_ERROR = {"message_id": "failed", "status": "error"}
+
+# Returned by get_chats when chats cannot be fetched, to show the expected format
+_SAMPLE_CHAT_TEMPLATE = {
+    "id": "sample_contact@c.us",
+    "name": "Sample Contact",
+    "type": "contact",
+    "last_message_time": 0,
+    "archive": False,
+    "ephemeralExpiration": 0,
+    "ephemeralSettingTimestamp": 0,
+    "muteExpiration": 0,
+    "notSpam": True,
+    "unread_count": 0,
+    "is_pinned": False,
+    "formatted_time": None,
+}
+
+
+def _err(phone_number: str, content: str, error: Any, **extra: Any) -> Dict[str, Any]:
+    """Build the failed-send result returned by send_message."""
+    return {
+        **_BASE_ERROR,
+        "timestamp": now_iso(),
+        "error": str(error),
+        "phone_number": phone_number,
+        "content_length": len(content) if content else 0,
+        **extra,
+    }
+
+
+class HistoryMessage(NamedTuple):
+    """One parsed chat history message; use ``_asdict()`` for the JSON shape."""
+
+    id: str
+    timestamp: int
+    type: str
+    chat_id: str
+    sender_name: str
+    sender_id: str
+    text_message: str
+    download_url: str
+    caption: str
+    formatted_time: Optional[str]
+
+
+def _parse_message(message_data: Dict[str, Any], default_chat_id: str) -> HistoryMessage:
+    """Convert one GreenAPI history record into a HistoryMessage."""
+    timestamp = message_data.get("timestamp", 0)
+    return HistoryMessage(
+        id=message_data.get("idMessage", "unknown"),
+        timestamp=timestamp,
+        type=message_data.get("typeMessage", "textMessage"),
+        chat_id=message_data.get("chatId", default_chat_id),
+        sender_name=message_data.get("senderName", "Unknown"),
+        sender_id=message_data.get("senderId", ""),
+        text_message=message_data.get("textMessage", ""),
+        download_url=message_data.get("downloadUrl", ""),
+        caption=message_data.get("caption", ""),
+        # Formatting is memoized, so repeated timestamps are formatted once
+        formatted_time=iso_from_timestamp(timestamp) if timestamp else None
+    )
 
 
 async def send_message(
     phone_number: str, content: str, reply_to: Optional[str] = None
 ) -> dict:
-    """Send a message to a chat."""
-    logger.info(f"Sending message to {phone_number}")
+    """Send a message to a chat.
 
-    whatsapp_client = auth_manager.get_client()
-    if not whatsapp_client:
-        raise ValueError("Session not found")
+    The GreenAPI call runs in a worker thread, so several sends can be awaited
+    together with ``asyncio.gather``.
+    """
+    logger.info("Sending message to %s", phone_number)
+    return await _send_message(require_client(), phone_number, content)
 
-    if not whatsapp_client.client:
-        raise ValueError("WhatsApp client not initialized")
 
+async def _send_message(green_api: GreenApi, phone_number: str, content: str) -> dict:
+    """Send a message to a chat with an already resolved GreenAPI client."""
     try:
         chat_id = _get_chat_id(phone_number)
         # Send the message via the WhatsApp API
-        logger.info(f"Formatted chat_id: {chat_id}")
-        logger.debug(f"Sending message to {chat_id}: {content}")
+        logger.info("Formatted chat_id: %s", chat_id)
+        logger.debug("Sending message to %s: %s", chat_id, content)
 
-        # Convert to asyncio to prevent blocking
-        response = whatsapp_client.client.sending.sendMessage(chat_id, content)
+        # Run the blocking SDK call off the event loop
+        response = await call_api(green_api.sending.sendMessage, chat_id, content)
 
-        logger.info(f"Response code {response.code}: {response.data}")
+        logger.info("Send message response code: %s", response.code)
+        logger.debug("Send message response data: %s", response.data)
 
         # Check if the response indicates an error
         if response.code != 200:
             error_msg = f"GreenAPI Error {response.code}: {response.data}"
             logger.error(error_msg)
-            return {
-                "message_id": "failed",
-                "status": "error",
-                "timestamp": datetime.now().isoformat(),
-                "error": error_msg,
-                "response": response.data,
-                "phone_number": phone_number,
-                "formatted_chat_id": chat_id,
-                "content_length": len(content)
-            }
+            return _err(
+                phone_number, content, error_msg,
+                response=response.data, formatted_chat_id=chat_id
+            )
 
         response_data = response.data
 
@@ -95,95 +190,128 @@ async def send_message(
         result = {
             "message_id": message_id,
             "status": "sent",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
             "response": response_data,
             "phone_number": phone_number,
             "formatted_chat_id": chat_id,
             "content_length": len(content)
         }
 
-        logger.info(f"Message sent successfully with ID {message_id}")
+        _invalidate_chat_history(chat_id)
+        logger.info("Message sent successfully with ID %s", message_id)
         return result
 
     except Exception as e:
-        logger.error(f"Failed to send message: {e}")
-        return {
-            "message_id": "failed",
-            "status": "error",
-            "timestamp": datetime.now().isoformat(),
-            "error": str(e),
-            "phone_number": phone_number,
-            "content_length": len(content) if content else 0
-        }
+        logger.error("Failed to send message: %s", e)
+        return _err(phone_number, content, e)
 
 
-async def get_chat_history(chat_id: str, count: int = 100) -> List[Dict[str, Any]]:
-    """Get chat history for a specific chat using GreenAPI."""
-    logger.info(f"Getting chat history for {chat_id} with count {count}")
+async def send_messages_bulk(
+    messages: List[Tuple[str, str]], concurrency: int = 10
+) -> List[Dict[str, Any]]:
+    """Send several (phone_number, content) messages concurrently.
+
+    At most ``concurrency`` sends are in flight at once. Results come back in
+    input order, with failures reported in the same error shape as
+    ``send_message``.
+    """
+    logger.info("Sending %s messages with concurrency %s", len(messages), concurrency)
+    # Resolve the client once and use it for the whole batch
+    try:
+        green_api = require_client()
+    except ValueError as e:
+        return [_err(phone_number, content, e) for phone_number, content in messages]
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _send_one(phone_number: str, content: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await _send_message(green_api, phone_number, content)
+
+    results = await asyncio.gather(
+        *(_send_one(phone_number, content) for phone_number, content in messages),
+        return_exceptions=True,
+    )
+    return [
+        _err(phone_number, content, result) if isinstance(result, BaseException) else result
+        for (phone_number, content), result in zip(messages, results)
+    ]
+
+
+async def iter_chat_history(chat_id: str, count: int = 100) -> AsyncIterator[HistoryMessage]:
+    """Yield chat history messages for a specific chat as they are parsed.
 
-    whatsapp_client = auth_manager.get_client()
-    if not whatsapp_client:
-        raise ValueError("Session not found")
+    Lets callers forward messages one at a time, or stop early, without
+    materializing the whole history.
+    """
+    logger.info("Getting chat history for %s with count %s", chat_id, count)
 
-    if not whatsapp_client.client:
-        raise ValueError("WhatsApp client not initialized")
+    green_api = require_client()
 
     try:
         # Format the chat_id properly
         formatted_chat_id = _get_chat_id(chat_id)
         
-        # Use GreenAPI's getChatHistory method
-        response = whatsapp_client.client.journals.getChatHistory(formatted_chat_id, count)
+        # Use GreenAPI's getChatHistory method off the event loop
+        response = await call_api(
+            green_api.journals.getChatHistory, formatted_chat_id, count
+        )
 
-        logger.info(f"Chat history response code: {response.code}")
-        logger.info(f"Chat history response data length: {len(response.data) if response.data else 0}")
+        logger.info("Chat history response code: %s", response.code)
+        logger.info("Chat history response data length: %s", len(response.data) if response.data else 0)
 
-        messages = []
         if response.code == 200 and response.data:
-            for message_data in response.data:
-                message = {
-                    "id": message_data.get("idMessage", "unknown"),
-                    "timestamp": message_data.get("timestamp", 0),
-                    "type": message_data.get("typeMessage", "textMessage"),
-                    "chat_id": message_data.get("chatId", formatted_chat_id),
-                    "sender_name": message_data.get("senderName", "Unknown"),
-                    "sender_id": message_data.get("senderId", ""),
-                    "text_message": message_data.get("textMessage", ""),
-                    "download_url": message_data.get("downloadUrl", ""),
-                    "caption": message_data.get("caption", ""),
-                    "formatted_time": datetime.fromtimestamp(
-                        message_data.get("timestamp", 0)
-                    ).isoformat() if message_data.get("timestamp") else None
-                }
-                messages.append(message)
+            for m in response.data:
+                yield _parse_message(m, formatted_chat_id)
         else:
-            logger.warning(f"Failed to get chat history. Response code: {response.code}")
-
-        logger.info(f"Retrieved {len(messages)} messages for chat {formatted_chat_id}")
-        return messages
+            logger.warning("Failed to get chat history. Response code: %s", response.code)
 
     except Exception as e:
-        logger.error(f"Failed to get chat history for {chat_id}: {e}")
-        return []
+        logger.error("Failed to get chat history for %s: %s", chat_id, e)
+
+
+async def get_chat_history(chat_id: str, count: int = 100) -> List[Dict[str, Any]]:
+    """Get chat history for a specific chat using GreenAPI."""
+    # Cached pages are only served while a session is open, and only to the
+    # account that fetched them
+    green_api = require_client()
+    key = (green_api.idInstance, _get_chat_id(chat_id), count)
+    now = time.monotonic()
+    entry = _HISTORY_CACHE.get(key)
+    if entry and now - entry[0] < _HISTORY_TTL:
+        _HISTORY_CACHE.move_to_end(key)
+        logger.debug("Using cached chat history for %s", key[1])
+        return list(entry[1])
+
+    # Pages are cached in their JSON shape, so cache hits skip the conversion
+    messages = [m._asdict() async for m in iter_chat_history(chat_id, count)]
+    logger.info("Retrieved %s messages for chat %s", len(messages), chat_id)
+    if messages:
+        _HISTORY_CACHE[key] = (now, messages)
+        _HISTORY_CACHE.move_to_end(key)
+        if len(_HISTORY_CACHE) > _HISTORY_CACHE_SIZE:
+            _HISTORY_CACHE.popitem(last=False)
+    return list(messages)
+
+
+def _invalidate_chat_history(chat_id: str) -> None:
+    """Drop cached history pages for a chat."""
+    for key in [key for key in _HISTORY_CACHE if key[1] == chat_id]:
+        del _HISTORY_CACHE[key]
 
 
 async def get_chats(limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
     """Get a list of chats using GreenAPI."""
-    logger.info(f"Getting chats with limit {limit}, offset {offset}")
-
-    whatsapp_client = auth_manager.get_client()
-    if not whatsapp_client:
-        raise ValueError("Session not found")
+    logger.info("Getting chats with limit %s, offset %s", limit, offset)
 
-    if not whatsapp_client.client:
-        raise ValueError("WhatsApp client not initialized")
+    green_api = require_client()
 
     try:
-        # Use GreenAPI's getChats method to get list of chats
-        response = whatsapp_client.client.journals.getChats()
+        # Use GreenAPI's getChats method off the event loop to get list of chats
+        response = await call_api(green_api.journals.getChats)
 
-        logger.info(f"Get chats response code: {response.code}")
-        logger.info(f"Get chats response data: {response.data}")
+        logger.info("Get chats response code: %s", response.code)
+        logger.debug("Get chats response data: %s", response.data)
 
         chats = []
         if response.code == 200 and response.data:
@@ -192,47 +320,52 @@ async def get_chats(limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
             # Apply offset and limit for pagination
             paginated_chats = chat_list[offset:offset + limit]
             
-            for chat_data in paginated_chats:
-                # Extract chat information from GreenAPI response
-                chat = {
-                    "id": chat_data.get("id", "unknown"),
-                    "name": chat_data.get("name", "Unknown Contact"),
-                    "type": "group" if chat_data.get("id", "").endswith("@g.us") else "contact",
-                    "last_message_time": chat_data.get("lastMessageTime", 0),
-                    "archive": chat_data.get("archive", False),
-                    "ephemeralExpiration": chat_data.get("ephemeralExpiration", 0),
-                    "ephemeralSettingTimestamp": chat_data.get("ephemeralSettingTimestamp", 0),
-                    "muteExpiration": chat_data.get("muteExpiration", 0),
-                    "notSpam": chat_data.get("notSpam", True),
+            # Extract chat information from GreenAPI response
+            chats = [
+                {
+                    "id": (chat_id := c.get("id", "unknown")),
+                    "name": c.get("name", "Unknown Contact"),
+                    "type": _GROUP_TYPE if chat_id[-5:] == _GROUP_SUFFIX else _CONTACT_TYPE,
+                    "last_message_time": (ts := c.get("lastMessageTime", 0)),
+                    "archive": c.get("archive", False),
+                    "ephemeralExpiration": c.get("ephemeralExpiration", 0),
+                    "ephemeralSettingTimestamp": c.get("ephemeralSettingTimestamp", 0),
+                    "muteExpiration": c.get("muteExpiration", 0),
+                    "notSpam": c.get("notSpam", True),
                     "unread_count": 0,  # GreenAPI doesn't provide unread count in getChats
                     "is_pinned": False,  # GreenAPI doesn't provide pinned status in getChats
-                    "formatted_time": datetime.fromtimestamp(
-                        chat_data.get("lastMessageTime", 0)
-                    ).isoformat() if chat_data.get("lastMessageTime") else None
+                    "formatted_time": iso_from_timestamp(ts) if ts else None
                 }
-                chats.append(chat)
+                for c in paginated_chats
+            ]
         else:
-            logger.warning(f"Failed to get chats or no chats found. Response code: {response.code}")
+            logger.warning("Failed to get chats or no chats found. Response code: %s", response.code)
             # If getChats doesn't work, try alternative method
             try:
                 logger.info("Trying alternative method: getChatHistory")
                 # Try to get recent chat history as fallback
-                response = whatsapp_client.client.journals.getChatHistory("", 100)
+                response = await call_api(
+                    green_api.journals.getChatHistory, "", 100
+                )
                 
                 if response.code == 200 and response.data:
-                    # Extract unique chat IDs from chat history
-                    chat_ids = set()
+                    # Extract unique chat IDs from chat history in first-seen
+                    # order, stopping once the requested page is covered
+                    chat_ids: Dict[str, None] = {}
+                    target = offset + limit
                     for message in response.data:
                         chat_id = message.get("chatId")
-                        if chat_id:
-                            chat_ids.add(chat_id)
+                        if chat_id and chat_id not in chat_ids:
+                            chat_ids[chat_id] = None
+                            if len(chat_ids) >= target:
+                                break
                     
                     # Create chat objects from unique chat IDs
-                    for i, chat_id in enumerate(list(chat_ids)[offset:offset + limit]):
+                    for chat_id in itertools.islice(chat_ids, offset, target):
                         chat = {
                             "id": chat_id,
                             "name": chat_id.split("@")[0] if "@" in chat_id else "Unknown",
-                            "type": "group" if chat_id.endswith("@g.us") else "contact",
+                            "type": _GROUP_TYPE if chat_id[-5:] == _GROUP_SUFFIX else _CONTACT_TYPE,
                             "last_message_time": 0,
                             "archive": False,
                             "ephemeralExpiration": 0,
@@ -246,29 +379,12 @@ async def get_chats(limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
                         chats.append(chat)
                         
             except Exception as fallback_error:
-                logger.error(f"Fallback method also failed: {fallback_error}")
+                logger.error("Fallback method also failed: %s", fallback_error)
 
-        logger.info(f"Retrieved {len(chats)} chats")
+        logger.info("Retrieved %s chats", len(chats))
         return chats
 
     except Exception as e:
-        logger.error(f"Failed to get chats: {e}")
+        logger.error("Failed to get chats: %s", e)
         # Return a sample chat structure to show the expected format
-        sample_chats = [
-            {
-                "id": "sample_contact@c.us",
-                "name": "Sample Contact",
-                "type": "contact",
-                "last_message_time": 0,
-                "archive": False,
-                "ephemeralExpiration": 0,
-                "ephemeralSettingTimestamp": 0,
-                "muteExpiration": 0,
-                "notSpam": True,
-                "unread_count": 0,
-                "is_pinned": False,
-                "formatted_time": None,
-                "error": f"Failed to retrieve actual chats: {str(e)}"
-            }
-        ]
-        return sample_chats
+        return [{**_SAMPLE_CHAT_TEMPLATE, "error": f"Failed to retrieve actual chats: {str(e)}"}]
@@ -1,12 +1,17 @@
 """WhatsApp MCP Server implementation with robust error handling."""
 
 import asyncio
+import functools
 import json
 import logging
 import sys
+import time
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Sequence
+from string import Template
+from types import MappingProxyType, ModuleType
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
 
+import jsonschema
 from mcp.server import Server
 from mcp.server.lowlevel import NotificationOptions
 from mcp.server.models import InitializationOptions
@@ -19,8 +24,16 @@ from mcp.types import (
     Tool,
     TextContent,
 )
+from pydantic import BaseModel
 
 from whatsapp_mcp.modules import auth, group, message
+from whatsapp_mcp.utils import now_iso
+
+_orjson: Optional[ModuleType]
+try:
+    import orjson as _orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    _orjson = None
 
 # Logging configuration - ensure all logs go to stderr for MCP protocol compliance
 logging.basicConfig(level=logging.INFO, stream=sys.stderr)
@@ -38,26 +51,52 @@ def extract_credentials(arguments: Dict[str, Any]) -> Optional[Dict[str, str]]:
     return None
 
 
+def _redact_credentials(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy tool arguments with the API credentials masked, for logging."""
+    if "__credentials__" not in arguments:
+        return arguments
+    return {**arguments, "__credentials__": "***"}
+
+
+def _call_json(obj: Any) -> Any:
+    """Serialize an object through its own ``json()`` method, falling back to str."""
+    try:
+        return obj.json()
+    except Exception:
+        return str(obj)
+
+
+def _json_default(obj: Any) -> Any:
+    """Custom JSON serializer for non-serializable objects."""
+    # Pydantic models are by far the most common case, so check them first
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    # Attributes can differ between instances of one type (dynamic attributes,
+    # __slots__ subclasses), so these checks are made for every object
+    if hasattr(obj, "data"):
+        return obj.data
+    if hasattr(obj, "json"):
+        return _call_json(obj)
+    if hasattr(obj, "__dict__"):
+        return obj.__dict__
+    return str(obj)
+
+
 def safe_json_serialize(obj: Any) -> str:
-    """Safely serialize objects to JSON, handling non-serializable types."""
-    def json_serializer(obj):
-        """Custom JSON serializer for non-serializable objects."""
-        if hasattr(obj, 'data'):
-            return obj.data
-        elif hasattr(obj, 'json'):
-            try:
-                return obj.json()
-            except:
-                return str(obj)
-        elif hasattr(obj, '__dict__'):
-            return obj.__dict__
-        else:
-            return str(obj)
-    
+    """Safely serialize objects to JSON, handling non-serializable types.
+
+    Datetimes are written in ISO 8601 format; orjson encodes them natively.
+    """
     try:
-        return json.dumps(obj, default=json_serializer, indent=2)
+        if _orjson is not None:
+            return _orjson.dumps(
+                obj, default=_json_default, option=_orjson.OPT_INDENT_2 | _orjson.OPT_NON_STR_KEYS
+            ).decode()
+        return json.dumps(obj, default=_json_default, indent=2)
     except Exception as e:
-        logger.error(f"JSON serialization error: {e}")
+        logger.error("JSON serialization error: %s", e)
         return json.dumps({"error": f"Serialization failed: {str(e)}", "data": str(obj)})
 
 
@@ -65,747 +104,647 @@ def safe_json_serialize(obj: Any) -> str:
 server = Server("whatsapp-mcp-server")
 
 
-@server.list_tools()
-async def handle_list_tools() -> List[Tool]:
-    """List available WhatsApp tools."""
-    return [
-        Tool(
-            name="open_session",
-            description="Open a new WhatsApp session",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "__credentials__": {
-                        "type": "object",
-                        "properties": {
-                            "GREENAPI_ID_INSTANCE": {"type": "string"},
-                            "GREENAPI_API_TOKEN": {"type": "string"}
-                        },
-                        "description": "WhatsApp API credentials"
-                    }
+def _credentials_schema(description: str) -> Dict[str, Any]:
+    """Build the ``__credentials__`` property schema shared by every tool."""
+    return {"type": "object", "properties": _CREDENTIAL_PROPERTIES, "description": description}
+
+
+# Tool schemas are read-only, so the credential sub-schemas are shared between tools
+_CREDENTIAL_PROPERTIES = {
+    "GREENAPI_ID_INSTANCE": {"type": "string"},
+    "GREENAPI_API_TOKEN": {"type": "string"}
+}
+_CREDS_SCHEMA = _credentials_schema("WhatsApp API credentials (optional if session exists)")
+
+# Tool definitions never change, so they are built once at import
+_TOOLS: List[Tool] = [
+    Tool(
+        name="open_session",
+        description="Open a new WhatsApp session",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "__credentials__": _credentials_schema("WhatsApp API credentials")
+            },
+            "additionalProperties": True
+        }
+    ),
+    Tool(
+        name="close_session",
+        description="Close the current WhatsApp session",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "__credentials__": _credentials_schema("WhatsApp API credentials (optional, not used for closing session)")
+            },
+            "additionalProperties": True
+        }
+    ),
+    Tool(
+        name="get_session_status",
+        description="Get the current session status",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "__credentials__": _credentials_schema("WhatsApp API credentials (optional, not used for status check)")
+            },
+            "additionalProperties": True
+        }
+    ),
+    Tool(
+        name="send_message",
+        description="Send a message to a WhatsApp contact",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "phone_number": {
+                    "type": "string",
+                    "minLength": 1,
+                    "description": "Phone number with country code (e.g., '919876543210@c.us')"
                 },
-                "additionalProperties": True
-            }
-        ),
-        Tool(
-            name="close_session",
-            description="Close the current WhatsApp session",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "__credentials__": {
-                        "type": "object",
-                        "properties": {
-                            "GREENAPI_ID_INSTANCE": {"type": "string"},
-                            "GREENAPI_API_TOKEN": {"type": "string"}
-                        },
-                        "description": "WhatsApp API credentials (optional, not used for closing session)"
-                    }
+                "content": {
+                    "type": "string",
+                    "minLength": 1,
+                    "description": "Message content to send"
                 },
-                "additionalProperties": True
-            }
-        ),
-        Tool(
-            name="get_session_status",
-            description="Get the current session status",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "__credentials__": {
-                        "type": "object",
-                        "properties": {
-                            "GREENAPI_ID_INSTANCE": {"type": "string"},
-                            "GREENAPI_API_TOKEN": {"type": "string"}
-                        },
-                        "description": "WhatsApp API credentials (optional, not used for status check)"
-                    }
+                "reply_to": {
+                    "type": "string",
+                    "description": "ID of message to reply to (optional)"
                 },
-                "additionalProperties": True
-            }
-        ),
-        Tool(
-            name="send_message",
-            description="Send a message to a WhatsApp contact",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "phone_number": {
-                        "type": "string",
-                        "description": "Phone number with country code (e.g., '919876543210@c.us')"
-                    },
-                    "content": {
-                        "type": "string",
-                        "description": "Message content to send"
-                    },
-                    "reply_to": {
-                        "type": "string",
-                        "description": "ID of message to reply to (optional)"
-                    },
-                    "__credentials__": {
-                        "type": "object",
-                        "properties": {
-                            "GREENAPI_ID_INSTANCE": {"type": "string"},
-                            "GREENAPI_API_TOKEN": {"type": "string"}
-                        },
-                        "description": "WhatsApp API credentials (optional if session exists)"
-                    }
+                "__credentials__": _CREDS_SCHEMA
+            },
+            "required": ["phone_number", "content"],
+            "additionalProperties": True
+        }
+    ),
+    Tool(
+        name="get_chats",
+        description="Get a list of chats with pagination",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of chats to return (default: 50)",
+                    "default": 50
                 },
-                "required": ["phone_number", "content"],
-                "additionalProperties": True
-            }
-        ),
-        Tool(
-            name="get_chats",
-            description="Get a list of chats with pagination",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "limit": {
-                        "type": "integer",
-                        "description": "Maximum number of chats to return (default: 50)",
-                        "default": 50
-                    },
-                    "offset": {
-                        "type": "integer", 
-                        "description": "Offset for pagination (default: 0)",
-                        "default": 0
-                    },
-                    "__credentials__": {
-                        "type": "object",
-                        "properties": {
-                            "GREENAPI_ID_INSTANCE": {"type": "string"},
-                            "GREENAPI_API_TOKEN": {"type": "string"}
-                        },
-                        "description": "WhatsApp API credentials (optional if session exists)"
-                    }
+                "offset": {
+                    "type": "integer", 
+                    "description": "Offset for pagination (default: 0)",
+                    "default": 0
                 },
-                "additionalProperties": True
-            }
-        ),
-        Tool(
-            name="create_group",
-            description="Create a new WhatsApp group",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "group_name": {
-                        "type": "string",
-                        "description": "Name of the group to create"
-                    },
-                    "participants": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "List of participant phone numbers (e.g., ['919876543210@c.us'])"
-                    },
-                    "__credentials__": {
-                        "type": "object",
-                        "properties": {
-                            "GREENAPI_ID_INSTANCE": {"type": "string"},
-                            "GREENAPI_API_TOKEN": {"type": "string"}
-                        },
-                        "description": "WhatsApp API credentials (optional if session exists)"
-                    }
+                "__credentials__": _CREDS_SCHEMA
+            },
+            "additionalProperties": True
+        }
+    ),
+    Tool(
+        name="create_group",
+        description="Create a new WhatsApp group",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "group_name": {
+                    "type": "string",
+                    "minLength": 1,
+                    "description": "Name of the group to create"
                 },
-                "required": ["group_name", "participants"],
-                "additionalProperties": True
-            }
-        ),
-        Tool(
-            name="get_group_participants",
-            description="Get participants of a WhatsApp group",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "group_id": {
-                        "type": "string",
-                        "description": "WhatsApp group ID"
-                    },
-                    "__credentials__": {
-                        "type": "object",
-                        "properties": {
-                            "GREENAPI_ID_INSTANCE": {"type": "string"},
-                            "GREENAPI_API_TOKEN": {"type": "string"}
-                        },
-                        "description": "WhatsApp API credentials (optional if session exists)"
-                    }
+                "participants": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "minItems": 1,
+                    "description": "List of participant phone numbers (e.g., ['919876543210@c.us'])"
                 },
-                "required": ["group_id"],
-                "additionalProperties": True
-            }
-        ),
-        Tool(
-            name="get_account_info",
-            description="Get WhatsApp account information",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "__credentials__": {
-                        "type": "object",
-                        "properties": {
-                            "GREENAPI_ID_INSTANCE": {"type": "string"},
-                            "GREENAPI_API_TOKEN": {"type": "string"}
-                        },
-                        "description": "WhatsApp API credentials (optional if session exists)"
-                    }
+                "__credentials__": _CREDS_SCHEMA
+            },
+            "required": ["group_name", "participants"],
+            "additionalProperties": True
+        }
+    ),
+    Tool(
+        name="get_group_participants",
+        description="Get participants of a WhatsApp group",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "group_id": {
+                    "type": "string",
+                    "minLength": 1,
+                    "description": "WhatsApp group ID"
                 },
-                "additionalProperties": True
-            }
-        ),
-        Tool(
-            name="get_chat_history",
-            description="Get message history for a specific chat",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "chat_id": {
-                        "type": "string",
-                        "description": "Chat ID to get history for (e.g., '919876543210@c.us' or group ID)"
-                    },
-                    "count": {
-                        "type": "integer",
-                        "description": "Number of messages to retrieve (default: 100)",
-                        "default": 100
-                    },
-                    "__credentials__": {
+                "__credentials__": _CREDS_SCHEMA
+            },
+            "required": ["group_id"],
+            "additionalProperties": True
+        }
+    ),
+    Tool(
+        name="get_account_info",
+        description="Get WhatsApp account information",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "__credentials__": _CREDS_SCHEMA
+            },
+            "additionalProperties": True
+        }
+    ),
+    Tool(
+        name="get_chat_history",
+        description="Get message history for a specific chat",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "chat_id": {
+                    "type": "string",
+                    "minLength": 1,
+                    "description": "Chat ID to get history for (e.g., '919876543210@c.us' or group ID)"
+                },
+                "count": {
+                    "type": "integer",
+                    "description": "Number of messages to retrieve (default: 100)",
+                    "default": 100
+                },
+                "__credentials__": _CREDS_SCHEMA
+            },
+            "required": ["chat_id"],
+            "additionalProperties": True
+        }
+    )
+]
+
+
+# Runs several of the tools above in one request; defined after them so it
+# can list their names
+_TOOLS.append(
+    Tool(
+        name="batch",
+        description="Run several WhatsApp tool calls concurrently in one request",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "calls": {
+                    "type": "array",
+                    "items": {
                         "type": "object",
                         "properties": {
-                            "GREENAPI_ID_INSTANCE": {"type": "string"},
-                            "GREENAPI_API_TOKEN": {"type": "string"}
+                            "name": {"type": "string", "enum": [tool.name for tool in _TOOLS]},
+                            "arguments": {"type": "object", "default": {}}
                         },
-                        "description": "WhatsApp API credentials (optional if session exists)"
-                    }
+                        "required": ["name"]
+                    },
+                    "minItems": 1,
+                    "maxItems": 50,
+                    "description": "Tool calls to run, each with a tool name and its arguments"
                 },
-                "required": ["chat_id"],
-                "additionalProperties": True
+                "__credentials__": _CREDS_SCHEMA
+            },
+            "required": ["calls"],
+            "additionalProperties": True
+        }
+    )
+)
+
+
+# Argument validators compiled once per tool; handle_call_tool validates with
+# these instead of letting the server rebuild a validator on every call
+_VALIDATORS: Dict[str, jsonschema.protocols.Validator] = {}
+for _tool in _TOOLS:
+    _validator_cls = jsonschema.validators.validator_for(_tool.inputSchema)
+    _validator_cls.check_schema(_tool.inputSchema)
+    _VALIDATORS[_tool.name] = _validator_cls(_tool.inputSchema)
+
+# Optional integer arguments and their schema defaults, per tool. As in the
+# original handlers, a value that is not a whole number (null, a numeric
+# string, ...) falls back to the default rather than failing validation.
+_INTEGER_DEFAULTS: Dict[str, Dict[str, int]] = {
+    tool.name: {
+        field: spec["default"]
+        for field, spec in tool.inputSchema["properties"].items()
+        if spec.get("type") == "integer" and "default" in spec
+    }
+    for tool in _TOOLS
+}
+
+
+@server.list_tools()
+async def handle_list_tools() -> List[Tool]:
+    """List available WhatsApp tools."""
+    return _TOOLS
+
+
+# Successful responses of read-only tools that agents tend to poll, reused for
+# a few seconds per (tool, arguments) and dropped whenever the session changes
+_RESPONSE_TTL: Dict[str, float] = {"get_account_info": 5.0, "get_chats": 1.0}
+_RESPONSE_CACHE: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
+
+
+def _response_cache_key(name: str, arguments: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """Build the response cache key for a tool call, or None if the tool is not cached."""
+    if name not in _RESPONSE_TTL:
+        return None
+    args = {k: v for k, v in arguments.items() if k != "__credentials__"}
+    return name, json.dumps(args, sort_keys=True, default=str)
+
+
+def _get_cached_response(key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+    """Return a copy of a cached response that has not expired yet."""
+    entry = _RESPONSE_CACHE.get(key)
+    if entry is None:
+        return None
+    if time.monotonic() >= entry[0]:
+        del _RESPONSE_CACHE[key]
+        return None
+    return dict(entry[1])
+
+
+def _store_response(key: Tuple[str, str], response: Mapping[str, Any]) -> None:
+    """Cache a successful response, evicting expired entries."""
+    now = time.monotonic()
+    for cached_key, (expires_at, _) in list(_RESPONSE_CACHE.items()):
+        if now >= expires_at:
+            del _RESPONSE_CACHE[cached_key]
+    _RESPONSE_CACHE[key] = (now + _RESPONSE_TTL[key[0]], dict(response))
+
+
+_AUTH_LOCK = asyncio.Lock()
+
+# Fixed error payloads shared by every tool; handle_call_tool copies them
+# into each response rather than rebuilding them per call
+_NO_SESSION_ERROR = MappingProxyType({
+    "success": False,
+    "message": "No active session. Please open a session first or provide credentials.",
+    "status": "no_session"
+})
+_AUTH_FAILED_ERROR = MappingProxyType({
+    "success": False,
+    "message": "Failed to authenticate with provided credentials",
+    "status": "authentication_failed"
+})
+
+
+async def _ensure_session(credentials: Optional[Dict[str, str]]) -> Optional[Mapping[str, Any]]:
+    """Make sure an authenticated session exists, opening one from ``credentials`` if needed.
+
+    Returns an error response when no session could be established, otherwise None.
+    """
+    if auth.auth_manager.is_authenticated():
+        return None
+    if not credentials:
+        return _NO_SESSION_ERROR
+
+    # Concurrent calls arriving before a session exists wait for the first
+    # one to open it instead of each opening their own
+    async with _AUTH_LOCK:
+        if auth.auth_manager.is_authenticated():
+            return None
+        success, _ = await auth.auth_manager.open_session(credentials)
+    if not success:
+        return _AUTH_FAILED_ERROR
+    _RESPONSE_CACHE.clear()
+    return None
+
+
+def _with_session(
+    handler: Callable[[Dict[str, Any]], Awaitable[Mapping[str, Any]]]
+) -> Callable[[Dict[str, Any]], Awaitable[Mapping[str, Any]]]:
+    """Run ``handler`` once a session is established, else return the session error."""
+    @functools.wraps(handler)
+    async def wrapper(arguments: Dict[str, Any]) -> Mapping[str, Any]:
+        error = await _ensure_session(extract_credentials(arguments))
+        if error is not None:
+            return error
+        return await handler(arguments)
+
+    return wrapper
+
+
+def _find_argument_error(name: str, arguments: Dict[str, Any]) -> Optional[jsonschema.ValidationError]:
+    """Return the most relevant input schema violation in a tool's arguments, if any."""
+    validator = _VALIDATORS.get(name)
+    if validator is None:
+        return None
+    lenient = _INTEGER_DEFAULTS[name]
+    return jsonschema.exceptions.best_match(
+        error for error in validator.iter_errors(arguments)
+        if not (len(error.path) == 1 and error.path[0] in lenient)
+    )
+
+
+def _int_argument(arguments: Dict[str, Any], field: str, default: int) -> int:
+    """Read an optional integer argument, using the default for anything but a whole number."""
+    value = arguments.get(field, default)
+    # JSON Schema "integer" also admits integral floats such as 5.0
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, bool) or not isinstance(value, int):
+        return default
+    return value
+
+
+def _missing_field(error: jsonschema.ValidationError) -> Optional[str]:
+    """Name the required argument a validation error reports as missing or empty."""
+    if error.validator == "required":
+        return str(next(f for f in error.validator_value if f not in error.instance))
+    if error.validator in ("minLength", "minItems"):
+        return str(error.path[0])
+    return None
+
+
+async def _do_open_session(arguments: Dict[str, Any]) -> Mapping[str, Any]:
+    success, message_text = await auth.auth_manager.open_session(extract_credentials(arguments))
+    if success:
+        _RESPONSE_CACHE.clear()
+    return {
+        "success": success,
+        "message": message_text,
+        "status": "session_opened" if success else "session_failed"
+    }
+
+
+async def _do_close_session(arguments: Dict[str, Any]) -> Mapping[str, Any]:
+    success, message_text = auth.auth_manager.close_session()
+    _RESPONSE_CACHE.clear()
+    return {
+        "success": success,
+        "message": message_text,
+        "status": "session_closed" if success else "close_failed"
+    }
+
+
+async def _do_get_session_status(arguments: Dict[str, Any]) -> Mapping[str, Any]:
+    try:
+        status = auth.auth_manager.get_session_status()
+    except Exception as e:
+        logger.error("Error in get_session_status: %s", e)
+        return {
+            "success": False,
+            "status": {"authenticated": False, "state": "error", "message": f"Error: {str(e)}"},
+            "message": f"Failed to get session status: {str(e)}"
+        }
+    return {
+        "success": True,
+        "status": status,
+        "message": "Session status retrieved successfully"
+    }
+
+
+@_with_session
+async def _do_send_message(arguments: Dict[str, Any]) -> Mapping[str, Any]:
+    message_result = await message.send_message(
+        phone_number=arguments["phone_number"],
+        content=arguments["content"],
+        reply_to=arguments.get("reply_to")
+    )
+    message_result["success"] = True
+    return message_result
+
+
+@_with_session
+async def _do_get_chats(arguments: Dict[str, Any]) -> Mapping[str, Any]:
+    limit = _int_argument(arguments, "limit", 50)
+    offset = _int_argument(arguments, "offset", 0)
+    if limit <= 0:
+        limit = 50
+    if offset < 0:
+        offset = 0
+
+    chats = await message.get_chats(limit=limit, offset=offset)
+    return {
+        "success": True,
+        "chats": chats,
+        "total": len(chats),
+        "limit": limit,
+        "offset": offset,
+        "status": "success"
+    }
+
+
+@_with_session
+async def _do_create_group(arguments: Dict[str, Any]) -> Mapping[str, Any]:
+    group_result = await group.create_group(
+        group_name=arguments["group_name"], participants=arguments["participants"]
+    )
+    # Shallow copy of the model's fields; nested participants are left for
+    # the serializer to convert
+    group_data = dict(group_result)
+    group_data["success"] = True
+    return group_data
+
+
+@_with_session
+async def _do_get_group_participants(arguments: Dict[str, Any]) -> Mapping[str, Any]:
+    group_id = arguments["group_id"]
+    participants = await group.get_group_participants(group_id=group_id)
+    return {
+        "success": True,
+        "participants": participants,
+        "total": len(participants),
+        "group_id": group_id,
+        "status": "success"
+    }
+
+
+@_with_session
+async def _do_get_account_info(arguments: Dict[str, Any]) -> Mapping[str, Any]:
+    client = auth.auth_manager.get_client()
+    if not client or not client.client:
+        return {"success": False, "message": "No active WhatsApp client", "status": "no_client"}
+
+    # Fetch account settings and state concurrently, off the event loop
+    settings_response, state_response = await asyncio.gather(
+        auth.call_api(client.client.account.getSettings),
+        auth.call_api(client.client.account.getStateInstance),
+    )
+
+    account_info = {
+        "settings": settings_response,
+        "state": state_response,
+        "authenticated": client.is_authenticated,
+        "retrieved_at": now_iso()
+    }
+    return {
+        "success": True,
+        "account_info": account_info,
+        "message": "Account information retrieved successfully",
+        "status": "success"
+    }
+
+
+@_with_session
+async def _do_get_chat_history(arguments: Dict[str, Any]) -> Mapping[str, Any]:
+    chat_id = arguments["chat_id"]
+    count = _int_argument(arguments, "count", 100)
+    if count <= 0:
+        count = 100
+
+    messages = await message.get_chat_history(chat_id=chat_id, count=count)
+    return {
+        "success": True,
+        "messages": messages,
+        "total": len(messages),
+        "chat_id": chat_id,
+        "count": count,
+        "status": "success"
+    }
+
+
+async def _do_batch(arguments: Dict[str, Any]) -> Mapping[str, Any]:
+    credentials = extract_credentials(arguments)
+    if credentials:
+        # Authenticate once up front so the calls below all find the session
+        error = await _ensure_session(credentials)
+        if error is not None:
+            return error
+
+    ts = datetime.now()
+    calls = [(call["name"], call.get("arguments") or {}) for call in arguments["calls"]]
+    results = await asyncio.gather(*(
+        _run_tool(name, call_arguments, ts, _find_argument_error(name, call_arguments))
+        for name, call_arguments in calls
+    ))
+    return {
+        "success": True,
+        "results": results,
+        "total": len(results),
+        "succeeded": sum(1 for result in results if result.get("success")),
+        "status": "success"
+    }
+
+
+# Tool name -> (handler, action described in error messages, fields every
+# failed response carries so clients always see the same keys)
+_TOOL_DISPATCH: Dict[str, Tuple[Callable[[Dict[str, Any]], Awaitable[Mapping[str, Any]]], str, Dict[str, Any]]] = {
+    "open_session": (_do_open_session, "open session", {}),
+    "close_session": (_do_close_session, "close session", {}),
+    "get_session_status": (_do_get_session_status, "get session status", {}),
+    "send_message": (_do_send_message, "send message", {}),
+    "get_chats": (_do_get_chats, "get chats", {"chats": [], "total": 0}),
+    "get_chat_history": (_do_get_chat_history, "get chat history", {"messages": []}),
+    "create_group": (_do_create_group, "create group", {}),
+    "get_group_participants": (_do_get_group_participants, "get group participants", {"participants": []}),
+    "get_account_info": (_do_get_account_info, "get account info", {"account_info": None}),
+    "batch": (_do_batch, "run batch", {"results": []}),
+}
+_AVAILABLE_TOOLS = tuple(_TOOL_DISPATCH)
+
+# Missing-argument responses pre-rendered per tool; only the field name and
+# timestamp, both free of characters needing JSON escapes, are filled in per call
+_MISSING_PARAMETER_TEMPLATES: Dict[str, Template] = {
+    name: Template(safe_json_serialize({
+        **failure_fields,
+        "success": False,
+        "message": "Missing required parameter: $field",
+        "status": "validation_error",
+        "timestamp": "$ts"
+    }))
+    for name, (_, _, failure_fields) in _TOOL_DISPATCH.items()
+}
+
+
+async def _run_tool(
+    name: str, arguments: Dict[str, Any], ts: datetime, error: Optional[jsonschema.ValidationError]
+) -> Dict[str, Any]:
+    """Run one tool call and build its response.
+
+    ``error`` is the call's argument validation error, if any, as found by
+    _find_argument_error.
+    """
+    entry = _TOOL_DISPATCH.get(name)
+    if entry is None:
+        return {
+            "success": False,
+            "message": f"Unknown tool '{name}'",
+            "status": "unknown_tool",
+            "available_tools": _AVAILABLE_TOOLS,
+            "timestamp": ts
+        }
+
+    handler, action, failure_fields = entry
+    cache_key = _response_cache_key(name, arguments)
+    response: Optional[Mapping[str, Any]] = None
+    if error is not None:
+        field = _missing_field(error)
+        if field is not None:
+            message_text = f"Missing required parameter: {field}"
+        else:
+            location = ".".join(map(str, error.path)) or "arguments"
+            message_text = f"Invalid parameter {location}: {error.message}"
+        response = {"success": False, "message": message_text, "status": "validation_error"}
+    elif cache_key is not None:
+        response = _get_cached_response(cache_key)
+    if response is None:
+        try:
+            response = await handler(arguments)
+        except Exception as e:
+            logger.error("Error in %s: %s", name, e)
+            response = {
+                "success": False,
+                "message": f"Failed to {action}: {str(e)}",
+                "status": "error"
             }
-        )
-    ]
+        if response.get("success") and cache_key is not None:
+            _store_response(cache_key, response)
 
+    # Handler results may be shared payloads, so always build a new dict
+    if not response.get("success"):
+        return {**failure_fields, **response, "timestamp": ts}
+    return {**response, "timestamp": ts}
 
-@server.call_tool()
+
+def _text(text: str) -> List[TextContent]:
+    """Wrap serialized JSON as a tool call result."""
+    return [TextContent(type="text", text=text)]
+
+
+@server.call_tool(validate_input=False)
 async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
     """Handle tool calls with comprehensive error handling."""
+    ts = datetime.now()
     try:
-        logger.info(f"Executing tool: {name} with arguments: {arguments}")
-        
-        if name == "open_session":
-            try:
-                credentials = extract_credentials(arguments)
-                success, message_text = await auth.auth_manager.open_session(credentials)
-                result = safe_json_serialize({
-                    "success": success,
-                    "message": message_text,
-                    "status": "session_opened" if success else "session_failed",
-                    "timestamp": datetime.now().isoformat()
-                })
-            except Exception as e:
-                logger.error(f"Error in open_session: {e}")
-                result = safe_json_serialize({
-                    "success": False,
-                    "message": f"Failed to open session: {str(e)}",
-                    "status": "error",
-                    "timestamp": datetime.now().isoformat()
-                })
-            
-        elif name == "close_session":
-            try:
-                success, message_text = auth.auth_manager.close_session()
-                result = safe_json_serialize({
-                    "success": success,
-                    "message": message_text,
-                    "status": "session_closed" if success else "close_failed",
-                    "timestamp": datetime.now().isoformat()
-                })
-            except Exception as e:
-                logger.error(f"Error in close_session: {e}")
-                result = safe_json_serialize({
-                    "success": False,
-                    "message": f"Failed to close session: {str(e)}",
-                    "status": "error",
-                    "timestamp": datetime.now().isoformat()
-                })
-            
-        elif name == "get_session_status":
-            try:
-                status = auth.auth_manager.get_session_status()
-                result = safe_json_serialize({
-                    "success": True,
-                    "status": status,
-                    "message": "Session status retrieved successfully",
-                    "timestamp": datetime.now().isoformat()
-                })
-            except Exception as e:
-                logger.error(f"Error in get_session_status: {e}")
-                result = safe_json_serialize({
-                    "success": False,
-                    "status": {"authenticated": False, "state": "error", "message": f"Error: {str(e)}"},
-                    "message": f"Failed to get session status: {str(e)}",
-                    "timestamp": datetime.now().isoformat()
-                })
-            
-        elif name == "send_message":
-            try:
-                credentials = extract_credentials(arguments)
-                phone_number = arguments.get("phone_number")
-                content = arguments.get("content")
-                reply_to = arguments.get("reply_to")
-                
-                # Validate required parameters
-                if not phone_number:
-                    result = safe_json_serialize({
-                        "success": False,
-                        "message": "Missing required parameter: phone_number",
-                        "status": "validation_error",
-                        "timestamp": datetime.now().isoformat()
-                    })
-                elif not content:
-                    result = safe_json_serialize({
-                        "success": False,
-                        "message": "Missing required parameter: content",
-                        "status": "validation_error",
-                        "timestamp": datetime.now().isoformat()
-                    })
-                else:
-                    # Auto-authenticate if credentials provided and no session exists
-                    if not auth.auth_manager.is_authenticated() and credentials:
-                        success, _ = await auth.auth_manager.open_session(credentials)
-                        if not success:
-                            result = safe_json_serialize({
-                                "success": False,
-                                "message": "Failed to authenticate with provided credentials",
-                                "status": "authentication_failed",
-                                "timestamp": datetime.now().isoformat()
-                            })
-                        else:
-                            message_result = await message.send_message(
-                                phone_number=phone_number, content=content, reply_to=reply_to
-                            )
-                            message_result["success"] = True
-                            message_result["timestamp"] = datetime.now().isoformat()
-                            result = safe_json_serialize(message_result)
-                    elif not auth.auth_manager.is_authenticated():
-                        result = safe_json_serialize({
-                            "success": False,
-                            "message": "No active session. Please open a session first or provide credentials.",
-                            "status": "no_session",
-                            "timestamp": datetime.now().isoformat()
-                        })
-                    else:
-                        message_result = await message.send_message(
-                            phone_number=phone_number, content=content, reply_to=reply_to
-                        )
-                        message_result["success"] = True
-                        message_result["timestamp"] = datetime.now().isoformat()
-                        result = safe_json_serialize(message_result)
-            except Exception as e:
-                logger.error(f"Error in send_message: {e}")
-                result = safe_json_serialize({
-                    "success": False,
-                    "message": f"Failed to send message: {str(e)}",
-                    "status": "error",
-                    "timestamp": datetime.now().isoformat()
-                })
-                
-        elif name == "get_chats":
-            try:
-                credentials = extract_credentials(arguments)
-                limit = arguments.get("limit", 50)
-                offset = arguments.get("offset", 0)
-                
-                # Validate parameters
-                if not isinstance(limit, int) or limit <= 0:
-                    limit = 50
-                if not isinstance(offset, int) or offset < 0:
-                    offset = 0
-                
-                # Auto-authenticate if credentials provided and no session exists
-                if not auth.auth_manager.is_authenticated() and credentials:
-                    success, _ = await auth.auth_manager.open_session(credentials)
-                    if not success:
-                        result = safe_json_serialize({
-                            "success": False,
-                            "message": "Failed to authenticate with provided credentials",
-                            "chats": [],
-                            "total": 0,
-                            "status": "authentication_failed",
-                            "timestamp": datetime.now().isoformat()
-                        })
-                    else:
-                        chats = await message.get_chats(limit=limit, offset=offset)
-                        result = safe_json_serialize({
-                            "success": True,
-                            "chats": chats,
-                            "total": len(chats),
-                            "limit": limit,
-                            "offset": offset,
-                            "status": "success",
-                            "timestamp": datetime.now().isoformat()
-                        })
-                elif not auth.auth_manager.is_authenticated():
-                    result = safe_json_serialize({
-                        "success": False,
-                        "message": "No active session. Please open a session first or provide credentials.",
-                        "chats": [],
-                        "total": 0,
-                        "status": "no_session",
-                        "timestamp": datetime.now().isoformat()
-                    })
-                else:
-                    chats = await message.get_chats(limit=limit, offset=offset)
-                    result = safe_json_serialize({
-                        "success": True,
-                        "chats": chats,
-                        "total": len(chats),
-                        "limit": limit,
-                        "offset": offset,
-                        "status": "success",
-                        "timestamp": datetime.now().isoformat()
-                    })
-            except Exception as e:
-                logger.error(f"Error in get_chats: {e}")
-                result = safe_json_serialize({
-                    "success": False,
-                    "message": f"Failed to get chats: {str(e)}",
-                    "chats": [],
-                    "total": 0,
-                    "status": "error",
-                    "timestamp": datetime.now().isoformat()
-                })
-                
-        elif name == "create_group":
-            try:
-                credentials = extract_credentials(arguments)
-                group_name = arguments.get("group_name")
-                participants = arguments.get("participants", [])
-                
-                # Validate required parameters
-                if not group_name:
-                    result = safe_json_serialize({
-                        "success": False,
-                        "message": "Missing required parameter: group_name",
-                        "status": "validation_error",
-                        "timestamp": datetime.now().isoformat()
-                    })
-                elif not participants or not isinstance(participants, list):
-                    result = safe_json_serialize({
-                        "success": False,
-                        "message": "Missing or invalid required parameter: participants (must be a list)",
-                        "status": "validation_error",
-                        "timestamp": datetime.now().isoformat()
-                    })
-                elif len(participants) == 0:
-                    result = safe_json_serialize({
-                        "success": False,
-                        "message": "Participants list cannot be empty",
-                        "status": "validation_error",
-                        "timestamp": datetime.now().isoformat()
-                    })
-                else:
-                    # Auto-authenticate if credentials provided and no session exists
-                    if not auth.auth_manager.is_authenticated() and credentials:
-                        success, _ = await auth.auth_manager.open_session(credentials)
-                        if not success:
-                            result = safe_json_serialize({
-                                "success": False,
-                                "message": "Failed to authenticate with provided credentials",
-                                "status": "authentication_failed",
-                                "timestamp": datetime.now().isoformat()
-                            })
-                        else:
-                            group_result = await group.create_group(
-                                group_name=group_name, participants=participants
-                            )
-                            group_data = group_result.model_dump() if hasattr(group_result, 'model_dump') else group_result
-                            group_data["success"] = True
-                            group_data["timestamp"] = datetime.now().isoformat()
-                            result = safe_json_serialize(group_data)
-                    elif not auth.auth_manager.is_authenticated():
-                        result = safe_json_serialize({
-                            "success": False,
-                            "message": "No active session. Please open a session first or provide credentials.",
-                            "status": "no_session",
-                            "timestamp": datetime.now().isoformat()
-                        })
-                    else:
-                        group_result = await group.create_group(
-                            group_name=group_name, participants=participants
-                        )
-                        group_data = group_result.model_dump() if hasattr(group_result, 'model_dump') else group_result
-                        group_data["success"] = True
-                        group_data["timestamp"] = datetime.now().isoformat()
-                        result = safe_json_serialize(group_data)
-            except Exception as e:
-                logger.error(f"Error in create_group: {e}")
-                result = safe_json_serialize({
-                    "success": False,
-                    "message": f"Failed to create group: {str(e)}",
-                    "status": "error",
-                    "timestamp": datetime.now().isoformat()
-                })
-                
-        elif name == "get_group_participants":
-            try:
-                credentials = extract_credentials(arguments)
-                group_id = arguments.get("group_id")
-                
-                # Validate required parameters
-                if not group_id:
-                    result = safe_json_serialize({
-                        "success": False,
-                        "message": "Missing required parameter: group_id",
-                        "participants": [],
-                        "status": "validation_error",
-                        "timestamp": datetime.now().isoformat()
-                    })
-                else:
-                    # Auto-authenticate if credentials provided and no session exists
-                    if not auth.auth_manager.is_authenticated() and credentials:
-                        success, _ = await auth.auth_manager.open_session(credentials)
-                        if not success:
-                            result = safe_json_serialize({
-                                "success": False,
-                                "message": "Failed to authenticate with provided credentials",
-                                "participants": [],
-                                "status": "authentication_failed",
-                                "timestamp": datetime.now().isoformat()
-                            })
-                        else:
-                            participants = await group.get_group_participants(group_id=group_id)
-                            participants_data = [p.model_dump() if hasattr(p, 'model_dump') else p for p in participants]
-                            result = safe_json_serialize({
-                                "success": True,
-                                "participants": participants_data,
-                                "total": len(participants_data),
-                                "group_id": group_id,
-                                "status": "success",
-                                "timestamp": datetime.now().isoformat()
-                            })
-                    elif not auth.auth_manager.is_authenticated():
-                        result = safe_json_serialize({
-                            "success": False,
-                            "message": "No active session. Please open a session first or provide credentials.",
-                            "participants": [],
-                            "status": "no_session",
-                            "timestamp": datetime.now().isoformat()
-                        })
-                    else:
-                        participants = await group.get_group_participants(group_id=group_id)
-                        participants_data = [p.model_dump() if hasattr(p, 'model_dump') else p for p in participants]
-                        result = safe_json_serialize({
-                            "success": True,
-                            "participants": participants_data,
-                            "total": len(participants_data),
-                            "group_id": group_id,
-                            "status": "success",
-                            "timestamp": datetime.now().isoformat()
-                        })
-            except Exception as e:
-                logger.error(f"Error in get_group_participants: {e}")
-                result = safe_json_serialize({
-                    "success": False,
-                    "message": f"Failed to get group participants: {str(e)}",
-                    "participants": [],
-                    "status": "error",
-                    "timestamp": datetime.now().isoformat()
-                })
-                
-        elif name == "get_account_info":
-            try:
-                credentials = extract_credentials(arguments)
-                
-                # Auto-authenticate if credentials provided and no session exists
-                if not auth.auth_manager.is_authenticated() and credentials:
-                    success, _ = await auth.auth_manager.open_session(credentials)
-                    if not success:
-                        result = safe_json_serialize({
-                            "success": False,
-                            "message": "Failed to authenticate with provided credentials",
-                            "account_info": None,
-                            "status": "authentication_failed",
-                            "timestamp": datetime.now().isoformat()
-                        })
-                    else:
-                        client = auth.auth_manager.get_client()
-                        if not client or not client.client:
-                            result = safe_json_serialize({
-                                "success": False,
-                                "message": "No active WhatsApp client",
-                                "account_info": None,
-                                "status": "no_client",
-                                "timestamp": datetime.now().isoformat()
-                            })
-                        else:
-                            # Get account settings and state
-                            settings_response = client.client.account.getSettings()
-                            state_response = client.client.account.getStateInstance()
-                            
-                            account_info = {
-                                "settings": settings_response,
-                                "state": state_response,
-                                "authenticated": client.is_authenticated,
-                                "retrieved_at": datetime.now().isoformat()
-                            }
-                            result = safe_json_serialize({
-                                "success": True,
-                                "account_info": account_info,
-                                "message": "Account information retrieved successfully",
-                                "status": "success",
-                                "timestamp": datetime.now().isoformat()
-                            })
-                elif not auth.auth_manager.is_authenticated():
-                    result = safe_json_serialize({
-                        "success": False,
-                        "message": "No active session. Please open a session first or provide credentials.",
-                        "account_info": None,
-                        "status": "no_session",
-                        "timestamp": datetime.now().isoformat()
-                    })
-                else:
-                    client = auth.auth_manager.get_client()
-                    if not client or not client.client:
-                        result = safe_json_serialize({
-                            "success": False,
-                            "message": "No active WhatsApp client",
-                            "account_info": None,
-                            "status": "no_client",
-                            "timestamp": datetime.now().isoformat()
-                        })
-                    else:
-                        # Get account settings and state
-                        settings_response = client.client.account.getSettings()
-                        state_response = client.client.account.getStateInstance()
-                        
-                        account_info = {
-                            "settings": settings_response,
-                            "state": state_response,
-                            "authenticated": client.is_authenticated,
-                            "retrieved_at": datetime.now().isoformat()
-                        }
-                        result = safe_json_serialize({
-                            "success": True,
-                            "account_info": account_info,
-                            "message": "Account information retrieved successfully",
-                            "status": "success",
-                            "timestamp": datetime.now().isoformat()
-                        })
-            except Exception as e:
-                logger.error(f"Error in get_account_info: {e}")
-                result = safe_json_serialize({
-                    "success": False,
-                    "message": f"Failed to get account info: {str(e)}",
-                    "account_info": None,
-                    "status": "error",
-                    "timestamp": datetime.now().isoformat()
-                })
-        elif name == "get_chat_history":
-            try:
-                credentials = extract_credentials(arguments)
-                chat_id = arguments.get("chat_id")
-                count = arguments.get("count", 100)
-                
-                # Validate required parameters
-                if not chat_id:
-                    result = safe_json_serialize({
-                        "success": False,
-                        "message": "Missing required parameter: chat_id",
-                        "messages": [],
-                        "status": "validation_error",
-                        "timestamp": datetime.now().isoformat()
-                    })
-                else:
-                    # Validate count parameter
-                    if not isinstance(count, int) or count <= 0:
-                        count = 100
-                    
-                    # Auto-authenticate if credentials provided and no session exists
-                    if not auth.auth_manager.is_authenticated() and credentials:
-                        success, _ = await auth.auth_manager.open_session(credentials)
-                        if not success:
-                            result = safe_json_serialize({
-                                "success": False,
-                                "message": "Failed to authenticate with provided credentials",
-                                "messages": [],
-                                "status": "authentication_failed",
-                                "timestamp": datetime.now().isoformat()
-                            })
-                        else:
-                            messages = await message.get_chat_history(chat_id=chat_id, count=count)
-                            result = safe_json_serialize({
-                                "success": True,
-                                "messages": messages,
-                                "total": len(messages),
-                                "chat_id": chat_id,
-                                "count": count,
-                                "status": "success",
-                                "timestamp": datetime.now().isoformat()
-                            })
-                    elif not auth.auth_manager.is_authenticated():
-                        result = safe_json_serialize({
-                            "success": False,
-                            "message": "No active session. Please open a session first or provide credentials.",
-                            "messages": [],
-                            "status": "no_session",
-                            "timestamp": datetime.now().isoformat()
-                        })
-                    else:
-                        messages = await message.get_chat_history(chat_id=chat_id, count=count)
-                        result = safe_json_serialize({
-                            "success": True,
-                            "messages": messages,
-                            "total": len(messages),
-                            "chat_id": chat_id,
-                            "count": count,
-                            "status": "success",
-                            "timestamp": datetime.now().isoformat()
-                        })
-            except Exception as e:
-                logger.error(f"Error in get_chat_history: {e}")
-                result = safe_json_serialize({
-                    "success": False,
-                    "message": f"Failed to get chat history: {str(e)}",
-                    "messages": [],
-                    "status": "error",
-                    "timestamp": datetime.now().isoformat()
-                })
-        else:
-            result = safe_json_serialize({
-                "success": False,
-                "message": f"Unknown tool '{name}'",
-                "status": "unknown_tool",
-                "available_tools": ["open_session", "close_session", "get_session_status", "send_message", "get_chats", "get_chat_history", "create_group", "get_group_participants", "get_account_info"],
-                "timestamp": datetime.now().isoformat()
-            })
-            
+        logger.info("Executing tool: %s", name)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Tool %s arguments: %s", name, _redact_credentials(arguments))
+
+        error = _find_argument_error(name, arguments)
+        if error is not None:
+            field = _missing_field(error)
+            if field is not None:
+                return _text(_MISSING_PARAMETER_TEMPLATES[name].substitute(field=field, ts=ts.isoformat()))
+
+        return _text(safe_json_serialize(await _run_tool(name, arguments, ts, error)))
+
     except Exception as e:
-        logger.error(f"Critical error in tool '{name}': {e}")
-        result = safe_json_serialize({
+        logger.error("Critical error in tool '%s': %s", name, e)
+        return _text(safe_json_serialize({
             "success": False,
             "message": f"Critical error: {str(e)}",
             "status": "critical_error",
             "tool_name": name,
-            "timestamp": datetime.now().isoformat()
-        })
-    
-    return [TextContent(type="text", text=result)]
+            "timestamp": ts
+        }))
 
 
 async def main():
     """Main entry point for the WhatsApp MCP server."""
     logger.info("🚀 Starting WhatsApp MCP server...")
     
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="whatsapp-mcp-server",
-                server_version="1.0.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name="whatsapp-mcp-server",
+                    server_version="1.0.0",
+                    capabilities=server.get_capabilities(
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={},
+                    ),
                 ),
-            ),
-        )
+            )
+    finally:
+        auth.shutdown()
 
 
 if __name__ == "__main__":
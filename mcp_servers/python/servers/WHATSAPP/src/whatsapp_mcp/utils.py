@@ -0,0 +1,30 @@
+"""Shared helpers for WhatsApp MCP Server."""
+
+import functools
+import time
+from datetime import datetime
+
+
+@functools.lru_cache(maxsize=1)
+def _iso_for_second(second: int) -> str:
+    """Format a whole-second epoch timestamp as a local ISO 8601 string."""
+    return datetime.fromtimestamp(second).isoformat()
+
+
+def now_iso() -> str:
+    """Get the current local time as an ISO 8601 string, at one-second resolution.
+
+    The formatted value is cached until the second changes, so bursts of calls
+    share a single datetime construction.
+    """
+    return _iso_for_second(int(time.time()))
+
+
+@functools.lru_cache(maxsize=8192)
+def iso_from_timestamp(timestamp: int) -> str:
+    """Format an epoch timestamp from GreenAPI as a local ISO 8601 string.
+
+    Message and chat timestamps repeat across history pages and chat lists,
+    so formatted values are memoized.
+    """
+    return datetime.fromtimestamp(timestamp).isoformat()
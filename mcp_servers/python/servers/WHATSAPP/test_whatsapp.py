@@ -4,6 +4,25 @@
 import sys
 import requests
 import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from orjson import loads as _loads
+except ImportError:  # orjson is optional; json.loads also accepts bytes
+    _loads = json.loads
+
+# One keep-alive session for all checks so they share a single TLS connection;
+# transient gateway errors on the GET checks are retried (POSTs never are)
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=4,
+        max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+    ),
+)
 
 def test_greenapi_credentials(id_instance, api_token):
     """Test GreenAPI credentials by getting account settings."""
@@ -12,11 +31,11 @@ def test_greenapi_credentials(id_instance, api_token):
     url = f"https://api.green-api.com/waInstance{id_instance}/getSettings/{api_token}"
     
     try:
-        response = requests.get(url, timeout=10)
+        response = _SESSION.get(url, timeout=10)
         print(f"📡 Response Status: {response.status_code}")
         
         if response.status_code == 200:
-            data = response.json()
+            data = _loads(response.content)
             print("✅ Credentials are valid!")
             print(f"📋 Account Settings: {json.dumps(data, indent=2)}")
             return True
@@ -35,11 +54,11 @@ def test_instance_state(id_instance, api_token):
     url = f"https://api.green-api.com/waInstance{id_instance}/getStateInstance/{api_token}"
     
     try:
-        response = requests.get(url, timeout=10)
+        response = _SESSION.get(url, timeout=10)
         print(f"📡 Response Status: {response.status_code}")
         
         if response.status_code == 200:
-            data = response.json()
+            data = _loads(response.content)
             state = data.get("stateInstance", "unknown")
             print(f"📱 Instance State: {state}")
             
@@ -72,11 +91,11 @@ def test_send_message(id_instance, api_token, phone_number, message):
     }
     
     try:
-        response = requests.post(url, json=payload, timeout=10)
+        response = _SESSION.post(url, json=payload, timeout=10)
         print(f"📡 Response Status: {response.status_code}")
         
         if response.status_code == 200:
-            data = response.json()
+            data = _loads(response.content)
             print("✅ Message sent successfully!")
             print(f"📋 Response: {json.dumps(data, indent=2)}")
             return True
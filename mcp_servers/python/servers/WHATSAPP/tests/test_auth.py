@@ -0,0 +1,114 @@
+"""Tests for the auth module."""
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from whatsapp_mcp.modules import auth
+
+
+@pytest.fixture(autouse=True)
+def clear_credential_cache():
+    """Start every test with an empty credential cache."""
+    auth._CREDENTIAL_CACHE.clear()
+    yield
+    auth._CREDENTIAL_CACHE.clear()
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.modules.auth.GreenApi")
+async def test_initialize_reuses_cached_validation(mock_green_api):
+    """Test that repeated initialization with the same credentials validates once."""
+    mock_green_api.return_value.account.getSettings.return_value = MagicMock()
+
+    first = auth.WhatsAppClient(id_instance="1101", api_token="token")
+    second = auth.WhatsAppClient(id_instance="1101", api_token="token")
+
+    assert await first.initialize()
+    assert await second.initialize()
+
+    assert second.is_authenticated
+    assert second.client is first.client
+    assert mock_green_api.return_value.account.getSettings.call_count == 1
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.modules.auth.GreenApi")
+async def test_initialize_revalidates_expired_credentials(mock_green_api):
+    """Test that cached validations expire after the TTL."""
+    mock_green_api.return_value.account.getSettings.return_value = MagicMock()
+
+    assert await auth.WhatsAppClient(id_instance="1101", api_token="token").initialize()
+    key = ("1101", "token")
+    validated_at, client = auth._CREDENTIAL_CACHE[key]
+    auth._CREDENTIAL_CACHE[key] = (validated_at - auth._CREDENTIAL_TTL, client)
+
+    assert await auth.WhatsAppClient(id_instance="1101", api_token="token").initialize()
+    assert mock_green_api.return_value.account.getSettings.call_count == 2
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.modules.auth.GreenApi")
+async def test_initialize_validates_different_accounts_in_parallel(mock_green_api):
+    """Test that one account's validation does not wait for another's."""
+    import asyncio
+    import threading
+
+    second_started = threading.Event()
+    first_overlapped = []
+
+    def green_api(idInstance, apiTokenInstance):
+        client = MagicMock()
+        if idInstance == "1101":
+            # Blocks until the other account's validation is running too
+            client.account.getSettings.side_effect = lambda: first_overlapped.append(second_started.wait(2)) or MagicMock()
+        else:
+            client.account.getSettings.side_effect = lambda: second_started.set() or MagicMock()
+        return client
+
+    mock_green_api.side_effect = green_api
+
+    results = await asyncio.gather(
+        auth.WhatsAppClient(id_instance="1101", api_token="token").initialize(),
+        auth.WhatsAppClient(id_instance="2202", api_token="token").initialize(),
+    )
+
+    assert results == [True, True]
+    assert first_overlapped == [True]
+    assert not auth._CREDENTIAL_LOCKS
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.modules.auth.GreenApi")
+async def test_initialize_uses_keep_alive_session(mock_green_api):
+    """Test that the client's HTTP session keeps connections open."""
+    mock_green_api.return_value.account.getSettings.return_value = MagicMock()
+
+    client = auth.WhatsAppClient(id_instance="1101", api_token="token")
+    assert await client.initialize()
+
+    session = client.client.session
+    assert session.headers["Connection"] == "keep-alive"
+    assert session.get_adapter("https://api.green-api.com")._pool_maxsize == 10
+
+
+def test_keep_alive_session_never_resends_after_read_errors():
+    """Test that 429s keep the SDK's backoff while sent requests are not retried."""
+    retry = auth._keep_alive_session().get_adapter("https://api.green-api.com").max_retries
+
+    assert (retry.total, retry.backoff_factor, retry.status_forcelist) == (3, 1.0, [429])
+    assert retry.is_retry("POST", 429)
+    assert retry.read == 0
+    assert retry.other == 0
+
+
+@patch("whatsapp_mcp.modules.auth._API_EXECUTOR")
+def test_shutdown_closes_cached_client_sessions(mock_executor):
+    """Test that shutdown closes pooled connections of every known client."""
+    client = MagicMock()
+    auth._CREDENTIAL_CACHE[("1101", "token")] = (0.0, client)
+
+    auth.shutdown()
+
+    client.session.close.assert_called_once_with()
+    assert not auth._CREDENTIAL_CACHE
+    mock_executor.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
@@ -0,0 +1,120 @@
+"""Tests for the group module."""
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from whatsapp_mcp.modules import group
+
+
+@pytest.fixture(autouse=True)
+def clear_participants_cache():
+    """Start every test with an empty participants cache."""
+    group._PARTICIPANTS_CACHE.clear()
+    yield
+    group._PARTICIPANTS_CACHE.clear()
+
+
+def _response(code, data):
+    """Build a GreenAPI-style response object."""
+    return MagicMock(code=code, data=data)
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.modules.auth.auth_manager")
+async def test_get_group_participants(mock_auth_manager):
+    """Test get_group_participants implementation."""
+    groups_api = mock_auth_manager.session.client.groups
+    groups_api.getGroupData.return_value = _response(200, {
+        "participants": [
+            {"id": "911234567890@c.us", "isAdmin": True},
+            {"id": "919876543210@c.us", "name": "Member"},
+        ]
+    })
+
+    participants = await group.get_group_participants("120363000000000000@g.us")
+
+    groups_api.getGroupData.assert_called_once_with("120363000000000000@g.us")
+    assert [p.id for p in participants] == ["911234567890@c.us", "919876543210@c.us"]
+    assert [p.role for p in participants] == ["admin", "member"]
+    assert participants[1].name == "Member"
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.modules.auth.auth_manager")
+async def test_create_group(mock_auth_manager):
+    """Test create_group implementation."""
+    groups_api = mock_auth_manager.session.client.groups
+    groups_api.createGroup.return_value = _response(200, {"chatId": "120363000000000000@g.us"})
+
+    result = await group.create_group("Test Group", [" +911234567890 ", "919876543210@c.us"])
+
+    groups_api.createGroup.assert_called_once_with(
+        groupName="Test Group",
+        chatIds=["911234567890@c.us", "919876543210@c.us"],
+    )
+    assert result.id == "120363000000000000@g.us"
+    assert result.error is None
+    assert [p.id for p in result.participants] == ["911234567890@c.us", "919876543210@c.us"]
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.modules.auth.auth_manager")
+async def test_get_group_participants_cache_invalidated_on_add(mock_auth_manager):
+    """Test that participants are cached until membership changes."""
+    groups_api = mock_auth_manager.session.client.groups
+    groups_api.getGroupData.return_value = _response(200, {
+        "participants": [{"id": "911234567890@c.us"}]
+    })
+    groups_api.addGroupParticipant.return_value = _response(200, {"addParticipant": True})
+
+    await group.get_group_participants("120363000000000000@g.us")
+    await group.get_group_participants("120363000000000000@g.us")
+    assert groups_api.getGroupData.call_count == 1
+
+    assert await group.add_participant_to_group("120363000000000000@g.us", "919876543210")
+    await group.get_group_participants("120363000000000000@g.us")
+    assert groups_api.getGroupData.call_count == 2
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.modules.auth.auth_manager")
+async def test_get_group_participants_cache_not_shared_across_accounts(mock_auth_manager):
+    """Test that a new session on another account does not see cached participants."""
+    first_client = MagicMock(idInstance="1101")
+    first_client.groups.getGroupData.return_value = _response(200, {
+        "participants": [{"id": "911234567890@c.us"}]
+    })
+    second_client = MagicMock(idInstance="2202")
+    second_client.groups.getGroupData.return_value = _response(200, {
+        "participants": [{"id": "919876543210@c.us"}]
+    })
+
+    mock_auth_manager.session.client = first_client
+    participants = await group.get_group_participants("120363000000000000@g.us")
+    assert [p.id for p in participants] == ["911234567890@c.us"]
+
+    mock_auth_manager.session.client = second_client
+    participants = await group.get_group_participants("120363000000000000@g.us")
+    assert [p.id for p in participants] == ["919876543210@c.us"]
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.modules.auth.auth_manager")
+async def test_get_group_participants_cache_is_bounded(mock_auth_manager):
+    """Test that the participants cache evicts the least recently used group."""
+    mock_auth_manager.session.client.groups.getGroupData.return_value = _response(200, {
+        "participants": [{"id": "911234567890@c.us"}]
+    })
+
+    with patch.object(group, "_PARTICIPANTS_CACHE_SIZE", 2):
+        for group_id in ("1@g.us", "2@g.us", "3@g.us"):
+            await group.get_group_participants(group_id)
+
+    assert [key[1] for key in group._PARTICIPANTS_CACHE] == ["2@g.us", "3@g.us"]
+
+
+def test_format_phone_number_only_strips_surrounding_whitespace():
+    """Test that '+' signs and outer whitespace are removed but inner spaces are kept."""
+    assert group._format_phone_number(" +919876543210\n") == "919876543210@c.us"
+    assert group._format_phone_number("+91 98765 43210") == "91 98765 43210@c.us"
+    assert group._format_phone_number("919876543210@c.us") == "919876543210@c.us"
@@ -0,0 +1,226 @@
+"""Tests for the message module."""
+
+import asyncio
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from whatsapp_mcp.modules import message
+
+
+@pytest.fixture(autouse=True)
+def clear_history_cache():
+    """Start every test with an empty chat history cache."""
+    message._HISTORY_CACHE.clear()
+    yield
+    message._HISTORY_CACHE.clear()
+
+
+def _response(code, data):
+    """Build a GreenAPI-style response object."""
+    return MagicMock(code=code, data=data)
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.modules.auth.auth_manager")
+async def test_send_message(mock_auth_manager):
+    """Test send_message implementation."""
+    sending_api = mock_auth_manager.session.client.sending
+    sending_api.sendMessage.return_value = _response(200, {"idMessage": "BAE5F4886F6F2D05"})
+
+    results = await asyncio.gather(
+        message.send_message("9876543210", "Hello"),
+        message.send_message("120363000000000000@g.us", "Hi all"),
+    )
+
+    assert [r["message_id"] for r in results] == ["BAE5F4886F6F2D05"] * 2
+    assert [r["formatted_chat_id"] for r in results] == [
+        "919876543210@c.us",
+        "120363000000000000@g.us",
+    ]
+    assert sending_api.sendMessage.call_count == 2
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.modules.auth.auth_manager")
+async def test_get_chat_history(mock_auth_manager):
+    """Test get_chat_history implementation."""
+    journals_api = mock_auth_manager.session.client.journals
+    journals_api.getChatHistory.return_value = _response(200, [
+        {"idMessage": "1", "timestamp": 1700000000, "textMessage": "Hello"},
+        {"idMessage": "2", "typeMessage": "imageMessage"},
+    ])
+
+    messages = await message.get_chat_history("919876543210", count=2)
+
+    journals_api.getChatHistory.assert_called_once_with("919876543210@c.us", 2)
+    assert [m["id"] for m in messages] == ["1", "2"]
+    assert messages[0]["text_message"] == "Hello"
+    assert messages[1]["formatted_time"] is None
+
+
+def test_get_chat_id():
+    """Test chat ID formatting for contacts and groups."""
+    assert message._get_chat_id(" +919876543210 ") == "919876543210@c.us"
+    assert message._get_chat_id("9876543210") == "919876543210@c.us"
+    assert message._get_chat_id("+919876543210") == "919876543210@c.us"
+    assert message._get_chat_id("14155550100") == "14155550100@c.us"
+    assert message._get_chat_id("120363000000000000") == "120363000000000000@g.us"
+    assert message._get_chat_id("120363000000000000@g.us") == "120363000000000000@g.us"
+    assert message._get_chat_id(" +919876543210@c.us ") == "919876543210@c.us"
+    assert message._get_chat_id("John Doe") == "John Doe"
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.modules.auth.auth_manager")
+async def test_get_chats(mock_auth_manager):
+    """Test get_chats implementation."""
+    journals_api = mock_auth_manager.session.client.journals
+    journals_api.getChats.return_value = _response(200, [
+        {"id": "919876543210@c.us", "name": "Alice", "lastMessageTime": 1700000000},
+        {"id": "120363000000000000@g.us"},
+        {"id": "14155550100@c.us"},
+    ])
+
+    chats = await message.get_chats(limit=2, offset=0)
+
+    assert [c["id"] for c in chats] == ["919876543210@c.us", "120363000000000000@g.us"]
+    assert [c["type"] for c in chats] == ["contact", "group"]
+    assert chats[0]["formatted_time"] is not None
+    assert chats[1]["formatted_time"] is None
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.modules.auth.auth_manager")
+async def test_get_chats_falls_back_to_history(mock_auth_manager):
+    """Test that get_chats pages unique chat IDs from history in order."""
+    journals_api = mock_auth_manager.session.client.journals
+    journals_api.getChats.return_value = _response(404, None)
+    journals_api.getChatHistory.return_value = _response(200, [
+        {"chatId": "111@c.us"},
+        {"chatId": "222@c.us"},
+        {"chatId": "111@c.us"},
+        {},
+        {"chatId": "333@g.us"},
+        {"chatId": "444@c.us"},
+    ])
+
+    chats = await message.get_chats(limit=2, offset=1)
+
+    assert [c["id"] for c in chats] == ["222@c.us", "333@g.us"]
+    assert [c["type"] for c in chats] == ["contact", "group"]
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.modules.auth.auth_manager")
+async def test_send_messages_bulk(mock_auth_manager):
+    """Test that bulk sends keep input order and report failures uniformly."""
+    sending_api = mock_auth_manager.session.client.sending
+    sending_api.sendMessage.side_effect = lambda chat_id, content: _response(
+        200, {"idMessage": f"id-{content}"}
+    )
+
+    results = await message.send_messages_bulk(
+        [("9876543210", "one"), ("919876543211", "two")], concurrency=1
+    )
+
+    assert [r["message_id"] for r in results] == ["id-one", "id-two"]
+
+    mock_auth_manager.session = None
+    results = await message.send_messages_bulk([("9876543210", "three")])
+
+    assert results[0]["status"] == "error"
+    assert results[0]["error"] == "Session not found"
+    assert results[0]["phone_number"] == "9876543210"
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.modules.auth.auth_manager")
+async def test_send_message_api_error(mock_auth_manager):
+    """Test that GreenAPI errors are returned in the failed-send shape."""
+    sending_api = mock_auth_manager.session.client.sending
+    sending_api.sendMessage.return_value = _response(466, {"message": "quota exceeded"})
+
+    result = await message.send_message("9876543210", "Hello")
+
+    assert result["message_id"] == "failed"
+    assert result["status"] == "error"
+    assert result["formatted_chat_id"] == "919876543210@c.us"
+    assert result["response"] == {"message": "quota exceeded"}
+    assert result["content_length"] == 5
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.modules.auth.auth_manager")
+async def test_iter_chat_history_stops_early(mock_auth_manager):
+    """Test that chat history can be consumed one message at a time."""
+    journals_api = mock_auth_manager.session.client.journals
+    journals_api.getChatHistory.return_value = _response(200, [
+        {"idMessage": str(i), "timestamp": 1700000000 + i} for i in range(5)
+    ])
+
+    seen = []
+    async for item in message.iter_chat_history("919876543210@c.us", count=5):
+        seen.append(item.id)
+        if len(seen) == 2:
+            break
+
+    assert seen == ["0", "1"]
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.modules.auth.auth_manager")
+async def test_get_chat_history_cache_invalidated_on_send(mock_auth_manager):
+    """Test that history pages are cached until a message is sent to the chat."""
+    green_api = mock_auth_manager.session.client
+    green_api.journals.getChatHistory.return_value = _response(200, [{"idMessage": "1"}])
+    green_api.sending.sendMessage.return_value = _response(200, {"idMessage": "2"})
+
+    await message.get_chat_history("919876543210", count=10)
+    await message.get_chat_history("+919876543210", count=10)
+    assert green_api.journals.getChatHistory.call_count == 1
+
+    await message.send_message("919876543210", "Hello")
+    await message.get_chat_history("919876543210", count=10)
+    assert green_api.journals.getChatHistory.call_count == 2
+
+
+def test_make_chat_id_fn_uses_configured_country_code():
+    """Test chat ID formatting for a non-Indian default country code."""
+    chat_id_for = message._make_chat_id_fn("44", 10)
+
+    assert chat_id_for("7700900123") == "447700900123@c.us"
+    assert chat_id_for("9876543210") == "449876543210@c.us"
+    assert chat_id_for("447700900123") == "447700900123@c.us"
+    assert message._make_chat_id_fn("", 10)("7700900123") == "7700900123@c.us"
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.modules.auth.auth_manager")
+async def test_get_chat_history_cache_hit_returns_new_list(mock_auth_manager):
+    """Test that cached pages come back as dicts in a list callers may modify."""
+    journals_api = mock_auth_manager.session.client.journals
+    journals_api.getChatHistory.return_value = _response(200, [{"idMessage": "1"}, {"idMessage": "2"}])
+
+    first = await message.get_chat_history("919876543210", count=2)
+    first.pop()
+    second = await message.get_chat_history("919876543210", count=2)
+
+    assert [m["id"] for m in second] == ["1", "2"]
+    assert journals_api.getChatHistory.call_count == 1
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.modules.auth.auth_manager")
+async def test_get_chat_history_cache_not_shared_across_accounts(mock_auth_manager):
+    """Test that a new session on another account does not see cached history."""
+    first_client = MagicMock(idInstance="1101")
+    first_client.journals.getChatHistory.return_value = _response(200, [{"idMessage": "first"}])
+    second_client = MagicMock(idInstance="2202")
+    second_client.journals.getChatHistory.return_value = _response(200, [{"idMessage": "second"}])
+
+    mock_auth_manager.session.client = first_client
+    assert [m["id"] for m in await message.get_chat_history("919876543210", count=10)] == ["first"]
+
+    mock_auth_manager.session.client = second_client
+    assert [m["id"] for m in await message.get_chat_history("919876543210", count=10)] == ["second"]
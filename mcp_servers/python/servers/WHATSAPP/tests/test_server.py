@@ -113,3 +113,448 @@ def test_registered_tools(mock_mcp):
     assert "create_group" in tool_names
     assert "get_group_participants" in tool_names
 
+
+
+def test_safe_json_serialize_handles_api_responses():
+    """Test that GreenAPI responses and plain objects serialize to JSON."""
+    import json
+
+    from whatsapp_mcp.server import safe_json_serialize
+
+    class Opaque:
+        __slots__ = ()
+
+        def __str__(self):
+            return "opaque"
+
+    response = MagicMock(spec=["data"], data={"wid": "919876543210@c.us"})
+
+    result = json.loads(safe_json_serialize({"settings": response, "other": Opaque(), 1: "one"}))
+
+    assert result == {"settings": {"wid": "919876543210@c.us"}, "other": "opaque", "1": "one"}
+
+
+def test_safe_json_serialize_checks_attributes_per_object():
+    """Test that objects of one type with different attributes serialize differently."""
+    import json
+
+    from whatsapp_mcp.server import safe_json_serialize
+
+    class Payload:
+        def __str__(self):
+            return "payload"
+
+    with_data = Payload()
+    with_data.data = {"wid": "919876543210@c.us"}
+
+    result = json.loads(safe_json_serialize([Payload(), with_data]))
+
+    assert result == [{}, {"wid": "919876543210@c.us"}]
+
+
+@pytest.mark.asyncio
+async def test_handle_list_tools_reuses_tool_definitions():
+    """Test that listing tools returns the prebuilt definitions."""
+    from whatsapp_mcp.server import handle_list_tools
+
+    first = await handle_list_tools()
+    second = await handle_list_tools()
+
+    assert first is second
+    assert "send_message" in {tool.name for tool in first}
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.server.auth.auth_manager")
+async def test_handle_call_tool_requires_session(mock_auth_manager):
+    """Test that tools report no_session without a session or credentials."""
+    import json
+
+    from whatsapp_mcp.server import handle_call_tool
+
+    mock_auth_manager.is_authenticated.return_value = False
+
+    [content] = await handle_call_tool("get_chats", {})
+    result = json.loads(content.text)
+
+    assert result["success"] is False
+    assert result["status"] == "no_session"
+    assert result["chats"] == [] and result["total"] == 0
+    assert "timestamp" in result
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.server.auth.auth_manager")
+async def test_handle_call_tool_validates_before_authenticating(mock_auth_manager):
+    """Test that missing arguments are reported without opening a session."""
+    import json
+
+    from whatsapp_mcp.server import handle_call_tool
+
+    mock_auth_manager.is_authenticated.return_value = False
+
+    [content] = await handle_call_tool("get_chat_history", {"__credentials__": {"GREENAPI_ID_INSTANCE": "1"}})
+    result = json.loads(content.text)
+
+    assert result["status"] == "validation_error"
+    assert result["message"] == "Missing required parameter: chat_id"
+    assert result["messages"] == []
+    mock_auth_manager.open_session.assert_not_called()
+
+
+def test_safe_json_serialize_dumps_pydantic_models():
+    """Test that Pydantic models serialize through model_dump."""
+    import json
+
+    from whatsapp_mcp.models import Participant
+    from whatsapp_mcp.server import safe_json_serialize
+
+    participant = Participant(id="911234567890@c.us", role="admin")
+
+    result = json.loads(safe_json_serialize({"participants": [participant, participant]}))
+
+    assert result["participants"][1]["id"] == "911234567890@c.us"
+    assert result["participants"][1]["role"] == "admin"
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.server.group.create_group", new_callable=AsyncMock)
+@patch("whatsapp_mcp.server.auth.auth_manager")
+async def test_handle_call_tool_create_group_serializes_model(mock_auth_manager, mock_create_group):
+    """Test that create_group returns the group fields with nested participants."""
+    import json
+
+    from whatsapp_mcp.models import Group, Participant
+    from whatsapp_mcp.server import handle_call_tool
+
+    mock_auth_manager.is_authenticated.return_value = True
+    mock_create_group.return_value = Group(
+        id="120363000000000000@g.us",
+        name="Team",
+        participants=[Participant(id="911234567890@c.us")],
+    )
+
+    [content] = await handle_call_tool("create_group", {"group_name": "Team", "participants": ["911234567890"]})
+    result = json.loads(content.text)
+
+    assert result["success"] is True
+    assert result["id"] == "120363000000000000@g.us"
+    assert result["participants"][0]["id"] == "911234567890@c.us"
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.server.auth.auth_manager")
+async def test_handle_call_tool_does_not_log_credentials(mock_auth_manager, caplog):
+    """Test that API tokens never reach the logs."""
+    import logging
+
+    from whatsapp_mcp.server import handle_call_tool
+
+    mock_auth_manager.get_session_status.return_value = {"authenticated": False}
+
+    with caplog.at_level(logging.DEBUG, logger="whatsapp_mcp.server"):
+        await handle_call_tool(
+            "get_session_status",
+            {"__credentials__": {"GREENAPI_ID_INSTANCE": "1101", "GREENAPI_API_TOKEN": "secret-token"}},
+        )
+
+    assert "Executing tool: get_session_status" in caplog.text
+    assert "secret-token" not in caplog.text
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.server.auth.auth_manager")
+async def test_handle_call_tool_get_account_info(mock_auth_manager):
+    """Test that account settings and state are both fetched and returned."""
+    import json
+
+    from whatsapp_mcp.server import handle_call_tool
+
+    mock_auth_manager.is_authenticated.return_value = True
+    mock_auth_manager.get_client.return_value.is_authenticated = True
+    account_api = mock_auth_manager.get_client.return_value.client.account
+    account_api.getSettings.return_value = MagicMock(spec=["data"], data={"wid": "919876543210@c.us"})
+    account_api.getStateInstance.return_value = MagicMock(spec=["data"], data={"stateInstance": "authorized"})
+
+    [content] = await handle_call_tool("get_account_info", {})
+    result = json.loads(content.text)
+
+    assert result["status"] == "success"
+    assert result["account_info"]["settings"] == {"wid": "919876543210@c.us"}
+    assert result["account_info"]["state"] == {"stateInstance": "authorized"}
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """Start every test with an empty tool response cache."""
+    from whatsapp_mcp import server
+
+    server._RESPONSE_CACHE.clear()
+    yield
+    server._RESPONSE_CACHE.clear()
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.server.message.get_chats", new_callable=AsyncMock)
+@patch("whatsapp_mcp.server.auth.auth_manager")
+async def test_handle_call_tool_caches_get_chats_until_session_closes(mock_auth_manager, mock_get_chats):
+    """Test that repeated get_chats polls reuse the response until the session changes."""
+    import json
+
+    from whatsapp_mcp.server import handle_call_tool
+
+    mock_auth_manager.is_authenticated.return_value = True
+    mock_auth_manager.close_session.return_value = (True, "Session closed successfully")
+    mock_get_chats.return_value = [{"id": "919876543210@c.us"}]
+
+    await handle_call_tool("get_chats", {"limit": 5})
+    [content] = await handle_call_tool("get_chats", {"limit": 5})
+    assert json.loads(content.text)["chats"] == [{"id": "919876543210@c.us"}]
+    assert mock_get_chats.await_count == 1
+
+    await handle_call_tool("get_chats", {"limit": 10})
+    assert mock_get_chats.await_count == 2
+
+    await handle_call_tool("close_session", {})
+    await handle_call_tool("get_chats", {"limit": 5})
+    assert mock_get_chats.await_count == 3
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.server.message.get_chat_history", new_callable=AsyncMock)
+@patch("whatsapp_mcp.server.message.get_chats", new_callable=AsyncMock)
+@patch("whatsapp_mcp.server.auth.auth_manager")
+async def test_handle_call_tool_coerces_integral_float_arguments(mock_auth_manager, mock_get_chats, mock_get_chat_history):
+    """Test that integral floats accepted by the schema reach the modules as ints."""
+    import json
+
+    from whatsapp_mcp.server import handle_call_tool
+
+    mock_auth_manager.is_authenticated.return_value = True
+    mock_get_chats.return_value = []
+    mock_get_chat_history.return_value = []
+
+    [content] = await handle_call_tool("get_chats", {"limit": 5.0, "offset": 2.0})
+    mock_get_chats.assert_awaited_once_with(limit=5, offset=2)
+    assert isinstance(mock_get_chats.await_args.kwargs["limit"], int)
+    assert json.loads(content.text)["limit"] == 5
+
+    await handle_call_tool("get_chat_history", {"chat_id": "919876543210", "count": 2.0})
+    mock_get_chat_history.assert_awaited_once_with(chat_id="919876543210", count=2)
+    assert isinstance(mock_get_chat_history.await_args.kwargs["count"], int)
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.server.message.get_chat_history", new_callable=AsyncMock)
+@patch("whatsapp_mcp.server.message.get_chats", new_callable=AsyncMock)
+@patch("whatsapp_mcp.server.auth.auth_manager")
+async def test_handle_call_tool_defaults_non_integer_optional_arguments(mock_auth_manager, mock_get_chats, mock_get_chat_history):
+    """Test that null or string limits and counts fall back to their defaults."""
+    import json
+
+    from whatsapp_mcp.server import handle_call_tool
+
+    mock_auth_manager.is_authenticated.return_value = True
+    mock_get_chats.return_value = []
+    mock_get_chat_history.return_value = []
+
+    [content] = await handle_call_tool("get_chats", {"limit": None, "offset": "5"})
+    assert json.loads(content.text)["success"] is True
+    mock_get_chats.assert_awaited_once_with(limit=50, offset=0)
+
+    [content] = await handle_call_tool("get_chat_history", {"chat_id": "919876543210", "count": "20"})
+    assert json.loads(content.text)["success"] is True
+    mock_get_chat_history.assert_awaited_once_with(chat_id="919876543210", count=100)
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.server.message.get_chat_history", new_callable=AsyncMock)
+@patch("whatsapp_mcp.server.auth.auth_manager")
+async def test_concurrent_calls_open_one_session(mock_auth_manager, mock_get_chat_history):
+    """Test that concurrent calls with credentials open the session only once."""
+    import asyncio
+
+    from whatsapp_mcp.server import handle_call_tool
+
+    authenticated = False
+
+    async def open_session(credentials):
+        nonlocal authenticated
+        await asyncio.sleep(0)
+        authenticated = True
+        return True, "Session created"
+
+    mock_auth_manager.is_authenticated.side_effect = lambda: authenticated
+    mock_auth_manager.open_session.side_effect = open_session
+    mock_get_chat_history.return_value = []
+    arguments = {"chat_id": "919876543210@c.us", "__credentials__": {"GREENAPI_ID_INSTANCE": "1"}}
+
+    await asyncio.gather(*(handle_call_tool("get_chat_history", arguments) for _ in range(3)))
+
+    assert mock_auth_manager.open_session.call_count == 1
+    assert mock_get_chat_history.await_count == 3
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.server.auth.auth_manager")
+async def test_handle_call_tool_rejects_invalid_arguments(mock_auth_manager):
+    """Test that arguments are checked against the tool's input schema."""
+    import json
+
+    from whatsapp_mcp.server import handle_call_tool
+
+    mock_auth_manager.is_authenticated.return_value = True
+
+    [content] = await handle_call_tool("send_message", {"phone_number": "", "content": "Hi"})
+    assert json.loads(content.text)["message"] == "Missing required parameter: phone_number"
+
+    [content] = await handle_call_tool("create_group", {"group_name": "Team", "participants": []})
+    assert json.loads(content.text)["message"] == "Missing required parameter: participants"
+
+    [content] = await handle_call_tool("get_chat_history", {"chat_id": 919876543210})
+    result = json.loads(content.text)
+    assert result["status"] == "validation_error"
+    assert result["message"].startswith("Invalid parameter chat_id:")
+    assert result["messages"] == []
+
+
+@pytest.mark.asyncio
+async def test_handle_call_tool_unknown_tool():
+    """Test that unknown tools list the available ones."""
+    import json
+
+    from whatsapp_mcp.server import handle_call_tool
+
+    [content] = await handle_call_tool("send_fax", {})
+    result = json.loads(content.text)
+
+    assert result["status"] == "unknown_tool"
+    assert "get_chat_history" in result["available_tools"]
+
+
+@pytest.mark.asyncio
+async def test_missing_parameter_response_matches_serialized_shape():
+    """Test that the pre-rendered missing-argument response is the usual JSON."""
+    import json
+
+    from whatsapp_mcp.server import handle_call_tool
+
+    [content] = await handle_call_tool("get_group_participants", {})
+    result = json.loads(content.text)
+
+    assert result == {
+        "participants": [],
+        "success": False,
+        "message": "Missing required parameter: group_id",
+        "status": "validation_error",
+        "timestamp": result["timestamp"],
+    }
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.server.message.send_message", new_callable=AsyncMock)
+@patch("whatsapp_mcp.server.auth.auth_manager")
+async def test_handle_call_tool_batch(mock_auth_manager, mock_send_message):
+    """Test that batch runs each call and reports per-call results."""
+    import json
+
+    from whatsapp_mcp.server import handle_call_tool
+
+    mock_auth_manager.is_authenticated.return_value = True
+    mock_auth_manager.get_session_status.return_value = {"authenticated": True}
+    mock_send_message.side_effect = lambda **kwargs: {"status": "success", "chat_id": kwargs["phone_number"]}
+
+    [content] = await handle_call_tool("batch", {"calls": [
+        {"name": "send_message", "arguments": {"phone_number": "911234567890", "content": "Hi"}},
+        {"name": "send_message", "arguments": {"phone_number": "919876543210"}},
+        {"name": "get_session_status"},
+    ]})
+    result = json.loads(content.text)
+
+    assert result["total"] == 3
+    assert result["succeeded"] == 2
+    first, second, third = result["results"]
+    assert first["chat_id"] == "911234567890" and first["success"] is True
+    assert second["message"] == "Missing required parameter: content"
+    assert third["success"] is True
+    assert mock_send_message.await_count == 1
+
+
+def test_safe_json_serialize_formats_datetimes():
+    """Test that datetimes serialize as ISO 8601 strings."""
+    import json
+    from datetime import datetime
+
+    from whatsapp_mcp.server import safe_json_serialize
+
+    stamp = datetime(2025, 7, 1, 12, 30, 15, 250000)
+
+    assert json.loads(safe_json_serialize({"timestamp": stamp})) == {"timestamp": stamp.isoformat()}
+
+
+def test_every_listed_tool_has_a_handler():
+    """Test that the dispatch table and the tool list cover the same tools."""
+    from whatsapp_mcp.server import _TOOL_DISPATCH, _TOOLS
+
+    assert {tool.name for tool in _TOOLS} == set(_TOOL_DISPATCH)
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.server.message.get_chat_history", new_callable=AsyncMock)
+@patch("whatsapp_mcp.server.auth.auth_manager")
+async def test_handle_call_tool_reports_authentication_failure(mock_auth_manager, mock_get_chat_history):
+    """Test that bad credentials stop the call before the handler runs."""
+    import json
+
+    from whatsapp_mcp.server import handle_call_tool
+
+    mock_auth_manager.is_authenticated.return_value = False
+    mock_auth_manager.open_session = AsyncMock(return_value=(False, "Failed to create session"))
+
+    [content] = await handle_call_tool(
+        "get_chat_history",
+        {"chat_id": "919876543210@c.us", "__credentials__": {"GREENAPI_ID_INSTANCE": "1", "GREENAPI_API_TOKEN": "bad"}},
+    )
+    result = json.loads(content.text)
+
+    assert result["status"] == "authentication_failed"
+    assert result["messages"] == []
+    mock_get_chat_history.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@patch("whatsapp_mcp.server.message.get_chat_history", new_callable=AsyncMock)
+@patch("whatsapp_mcp.server.auth.auth_manager")
+async def test_get_chat_history_response_same_after_auto_auth(mock_auth_manager, mock_get_chat_history):
+    """Test that auto-authenticated and already-authenticated calls build the same response."""
+    import json
+
+    from whatsapp_mcp.server import handle_call_tool
+
+    authenticated = False
+
+    async def open_session(credentials):
+        nonlocal authenticated
+        authenticated = True
+        return True, "Session created"
+
+    mock_auth_manager.is_authenticated.side_effect = lambda: authenticated
+    mock_auth_manager.open_session.side_effect = open_session
+    mock_get_chat_history.return_value = [{"id": "m1", "text": "Hi"}]
+    arguments = {"chat_id": "919876543210@c.us", "count": 5}
+
+    [first] = await handle_call_tool(
+        "get_chat_history", {**arguments, "__credentials__": {"GREENAPI_ID_INSTANCE": "1"}}
+    )
+    [second] = await handle_call_tool("get_chat_history", arguments)
+    first, second = json.loads(first.text), json.loads(second.text)
+
+    assert first.pop("timestamp") and second.pop("timestamp")
+    assert first == second == {
+        "success": True,
+        "messages": [{"id": "m1", "text": "Hi"}],
+        "total": 1,
+        "chat_id": "919876543210@c.us",
+        "count": 5,
+        "status": "success",
+    }
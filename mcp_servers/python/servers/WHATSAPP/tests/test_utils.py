@@ -0,0 +1,23 @@
+"""Tests for the shared helpers."""
+
+from datetime import datetime
+from unittest.mock import patch
+
+from whatsapp_mcp import utils
+
+
+@patch("whatsapp_mcp.utils.time.time")
+def test_now_iso_refreshes_each_second(mock_time):
+    """Test that now_iso is cached within a second and advances with the clock."""
+    mock_time.return_value = 1700000000.2
+    first = utils.now_iso()
+    mock_time.return_value = 1700000000.9
+    assert utils.now_iso() == first == datetime.fromtimestamp(1700000000).isoformat()
+
+    mock_time.return_value = 1700000001.0
+    assert utils.now_iso() == datetime.fromtimestamp(1700000001).isoformat()
+
+
+def test_iso_from_timestamp():
+    """Test that epoch timestamps format like datetime.isoformat."""
+    assert utils.iso_from_timestamp(1700000000) == datetime.fromtimestamp(1700000000).isoformat()